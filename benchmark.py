@@ -0,0 +1,353 @@
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+from engine import GameEngine, GameState, Threat, ThreatType
+from database import DatabaseManager
+from simulate import POLICIES, play_game
+
+
+# The quadratic reference sweep is skipped above this size
+LEGACY_LIMIT = 20000
+
+ENGINE_SIZES = [10, 100, 1000, 10000, 100000]
+DATABASE_SIZES = [10, 1000, 10000]
+INGEST_SIZES = [1000, 100000]
+
+# One commit per row gets slow quickly; the per-row comparison stops at this many
+PER_ROW_LIMIT = 5000
+DISPLAY_SIZES = [10, 100, 1000, 10000]
+
+# Roughly how many threat-turns each engine size gets, so small boards run many turns
+ENGINE_WORK = 2000000
+
+
+def make_board(engine, count, dead_every=2):
+    """count threats where every dead_every-th one is already defeated"""
+    threats = engine.generate_threats(count)
+    for i, threat in enumerate(threats):
+        if i % dead_every == 0:
+            threat.hp = 0
+    # Keep a few droppers in the mix so spawns are part of the measured work
+    for threat in threats[::50]:
+        threat.type = ThreatType.MALWARE_DROPPER
+    return threats
+
+
+def legacy_process_defeated_threats(engine):
+    """The old copy-and-remove sweep, kept only to compare against"""
+    for threat in engine.game_state.active_threats[:]:
+        if threat.hp <= 0:
+            if threat.type == ThreatType.MALWARE_DROPPER:
+                engine.game_state.active_threats.append(Threat(engine.rng.choice(engine.threat_sampler.choices), 10, 10, 5))
+            engine.game_state.active_threats.remove(threat)
+
+
+class DictThreat:
+    """Threat as it was before __slots__, for the memory comparison"""
+
+    def __init__(self, threat_type, hp, max_hp, attack, special_active=False, turns_alive=0, detection_chance=1.0):
+        self.type = threat_type
+        self.hp = hp
+        self.max_hp = max_hp
+        self.attack = attack
+        self.special_active = special_active
+        self.turns_alive = turns_alive
+        self.detection_chance = detection_chance
+
+
+class DictGameState:
+    """GameState as it was before __slots__, for the memory comparison"""
+
+    def __init__(self):
+        self.server_hp = 100
+        self.max_server_hp = 100
+        self.points = 50
+        self.score = 0
+        self.turn = 1
+        self.active_threats = []
+        self.owned_tools = []
+        self.game_over = False
+        self.points_multiplier = 1.0
+        self.tool_effectiveness_multiplier = 1.0
+        self.shop_price_multiplier = 1.0
+        self.botnet_buff = 0
+        self.scans_this_turn = 0
+        self.tools_used_this_turn = 0
+        self.purchases_this_turn = 0
+
+
+def allocated_bytes(factory, count):
+    """Average bytes allocated per object when building count of them"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [factory(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # The list holding them costs one pointer per object; leave it out
+    return (after - before) / len(objects) - 8
+
+
+def bench_memory(count=100000):
+    """Bytes per Threat and per empty GameState, dict-based versus slotted"""
+    # Large ints so small-int caching doesn't hide per-threat values
+    def threat_args(i):
+        return (ThreatType.VIRUS, 1000 + i, 1000 + i, 1000 + i)
+
+    return [
+        {'object': 'Threat', 'before_bytes': allocated_bytes(lambda i: DictThreat(*threat_args(i)), count),
+         'after_bytes': allocated_bytes(lambda i: Threat(*threat_args(i)), count)},
+        {'object': 'GameState', 'before_bytes': allocated_bytes(lambda i: DictGameState(), count // 10),
+         'after_bytes': allocated_bytes(lambda i: GameState(), count // 10)},
+    ]
+
+
+def time_call(func, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_defeated_sweep(sizes, seed=0, include_legacy=True):
+    """Time process_defeated_threats at each size; flat ns/threat means linear scaling"""
+    rows = []
+    for size in sizes:
+        engine = GameEngine(seed)
+        board = make_board(engine, size)
+
+        def sweep():
+            engine.game_state.active_threats = list(board)
+            engine.process_defeated_threats()
+
+        row = {'threats': size, 'sweep_s': time_call(sweep)}
+        row['ns_per_threat'] = row['sweep_s'] * 1e9 / size
+
+        if include_legacy and size <= LEGACY_LIMIT:
+            def legacy():
+                engine.game_state.active_threats = list(board)
+                legacy_process_defeated_threats(engine)
+            row['legacy_s'] = time_call(legacy, repeat=1)
+
+        rows.append(row)
+    return rows
+
+
+def bench_engine_turns(sizes, seed=0):
+    """Turns/second for generate_threats -> specials -> attacks -> defeated at steady board sizes
+
+    Each turn kills as many threats as it added, so the board stays at the
+    requested size for the whole run.
+    """
+    rows = []
+    for size in sizes:
+        engine = GameEngine(seed)
+        game_state = engine.game_state
+        game_state.active_threats = engine.generate_threats(size)
+        turns = max(5, min(2000, ENGINE_WORK // size))
+
+        start = time.perf_counter()
+        for _ in range(turns):
+            game_state.server_hp = game_state.max_server_hp = 10 ** 12
+            game_state.active_threats.extend(engine.generate_threats())
+            engine.process_threat_specials()
+            engine.process_threat_attacks()
+            for threat in game_state.active_threats[:len(game_state.active_threats) - size]:
+                threat.hp = 0
+            engine.process_defeated_threats()
+            game_state.turn += 1
+        elapsed = time.perf_counter() - start
+
+        rows.append({'threats': size, 'turns': turns, 'seconds': elapsed, 'turns_per_s': turns / elapsed})
+    return rows
+
+
+def bench_games(games, policy_name='greedy', seed=0):
+    """Complete single-process games per second"""
+    policy = POLICIES[policy_name]
+    start = time.perf_counter()
+    turns = 0
+    for i in range(games):
+        turns += play_game(policy, str(seed) + ":" + str(i))['turns']
+    elapsed = time.perf_counter() - start
+    return [{'policy': policy_name, 'games': games, 'seconds': elapsed, 'games_per_s': games / elapsed,
+             'turns_per_s': turns / elapsed}]
+
+
+def bench_database(sizes, seed=0, repeat=5):
+    """save_game / load_game round trips against a fresh on-disk database"""
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        db = DatabaseManager(os.path.join(directory, 'benchmark.db'))
+        for size in sizes:
+            engine = GameEngine(seed)
+            engine.game_state.active_threats = engine.generate_threats(size)
+            name = 'bench-' + str(size)
+
+            save_s = time_call(lambda: db.save_game(name, engine.game_state), repeat)
+            load_s = time_call(lambda: db.load_game(name), repeat)
+            rows.append({'threats': size, 'save_ms': save_s * 1000, 'load_ms': load_s * 1000})
+        db.conn.close()
+    return rows
+
+
+def bench_ingest(sizes, seed=0):
+    """High-score rows/second through ingest_high_scores, against one save_high_score per row"""
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        db = DatabaseManager(os.path.join(directory, 'benchmark.db'))
+        rng = random.Random(seed)
+        for size in sizes:
+            score_rows = (('bench', rng.randrange(100000), rng.randrange(200)) for _ in range(size))
+            row = {'rows': size, 'ingest_rows_per_s': db.ingest_high_scores(score_rows)['rows_per_s']}
+
+            if size <= PER_ROW_LIMIT:
+                start = time.perf_counter()
+                for _ in range(size):
+                    db.save_high_score('bench', rng.randrange(100000), rng.randrange(200))
+                row['per_row_rows_per_s'] = size / (time.perf_counter() - start)
+
+            rows.append(row)
+        db.close()
+    return rows
+
+
+def bench_display(sizes, seed=0, repeat=5):
+    """GameGUI.update_display for a full first draw and for a refresh after a few HP edits"""
+    import tkinter as tk
+    from testing2 import GameGUI
+
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        try:
+            gui = GameGUI('benchmark', db_path=os.path.join(directory, 'benchmark.db'))
+        except tk.TclError as error:
+            return [{'skipped': "no display: " + str(error)}]
+
+        gui.root.geometry("1200x800")
+        gui.root.update()
+        for size in sizes:
+            engine = GameEngine(seed)
+            threats = engine.generate_threats(size)
+
+            def first_draw():
+                gui.game.game_state.active_threats = [threat.copy() for threat in threats]
+                gui.update_display()
+                gui.root.update_idletasks()
+
+            def refresh():
+                for threat in gui.game.game_state.active_threats[:5]:
+                    threat.hp = max(1, threat.hp - 1)
+                gui.update_display()
+                gui.root.update_idletasks()
+
+            first_s = time_call(first_draw, repeat)
+            refresh_s = time_call(refresh, repeat)
+            rows.append({'threats': size, 'full_ms': first_s * 1000, 'refresh_ms': refresh_s * 1000})
+        gui.game.db.close()
+        gui.root.destroy()
+    return rows
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def print_rows(rows):
+    for row in rows:
+        print("  ".join(key + "=" + (str(round(value, 6)) if isinstance(value, float) else str(value))
+                        for key, value in row.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Engine benchmarks")
+    parser.add_argument('--json', metavar='PATH', help="also write the results as JSON")
+    parser.add_argument('--seed', type=int, default=0)
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    sweep_parser = subparsers.add_parser('sweep', help="process_defeated_threats scaling")
+    sweep_parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    sweep_parser.add_argument('--no-legacy', action='store_true', help="skip the quadratic reference sweep")
+
+    memory_parser = subparsers.add_parser('memory', help="bytes per Threat and GameState")
+    memory_parser.add_argument('--count', type=int, default=100000)
+
+    engine_parser = subparsers.add_parser('engine', help="turns/second at fixed active-threat counts")
+    engine_parser.add_argument('--sizes', type=int, nargs='+', default=ENGINE_SIZES)
+
+    games_parser = subparsers.add_parser('games', help="complete games/second")
+    games_parser.add_argument('--games', type=int, default=2000)
+    games_parser.add_argument('--policy', choices=sorted(POLICIES), default='greedy')
+
+    database_parser = subparsers.add_parser('database', help="save_game/load_game round trips")
+    database_parser.add_argument('--sizes', type=int, nargs='+', default=DATABASE_SIZES)
+
+    ingest_parser = subparsers.add_parser('ingest', help="bulk high-score ingest rows/second")
+    ingest_parser.add_argument('--sizes', type=int, nargs='+', default=INGEST_SIZES)
+
+    display_parser = subparsers.add_parser('display', help="update_display at several list sizes (needs a display)")
+    display_parser.add_argument('--sizes', type=int, nargs='+', default=DISPLAY_SIZES)
+
+    subparsers.add_parser('all', help="every benchmark with its default settings")
+
+    args = parser.parse_args()
+
+    if args.benchmark == 'sweep':
+        suites = {'sweep': lambda: bench_defeated_sweep(args.sizes, args.seed, not args.no_legacy)}
+    elif args.benchmark == 'memory':
+        suites = {'memory': lambda: bench_memory(args.count)}
+    elif args.benchmark == 'engine':
+        suites = {'engine': lambda: bench_engine_turns(args.sizes, args.seed)}
+    elif args.benchmark == 'games':
+        suites = {'games': lambda: bench_games(args.games, args.policy, args.seed)}
+    elif args.benchmark == 'database':
+        suites = {'database': lambda: bench_database(args.sizes, args.seed)}
+    elif args.benchmark == 'ingest':
+        suites = {'ingest': lambda: bench_ingest(args.sizes, args.seed)}
+    elif args.benchmark == 'display':
+        suites = {'display': lambda: bench_display(args.sizes, args.seed)}
+    else:
+        suites = {
+            'sweep': lambda: bench_defeated_sweep([1000, 10000, 100000], args.seed),
+            'memory': lambda: bench_memory(),
+            'engine': lambda: bench_engine_turns(ENGINE_SIZES, args.seed),
+            'games': lambda: bench_games(2000, 'greedy', args.seed),
+            'database': lambda: bench_database(DATABASE_SIZES, args.seed),
+            'ingest': lambda: bench_ingest(INGEST_SIZES, args.seed),
+            'display': lambda: bench_display(DISPLAY_SIZES, args.seed),
+        }
+
+    results = {}
+    for name, run in suites.items():
+        print(name)
+        results[name] = run()
+        print_rows(results[name])
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'environment': environment(), 'seed': args.seed, 'results': results}, f, indent=2)
+        print("Results written to " + args.json)
+
+
+if __name__ == "__main__":
+    main()
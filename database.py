@@ -0,0 +1,659 @@
+import bisect
+import itertools
+import logging
+import sqlite3
+import queue
+import struct
+import threading
+import time
+
+from save_format import (encode_game_state, decode_game_state, encode_manifest, decode_manifest,
+                         is_manifest, manifest_hashes, MANIFEST_MAGIC)
+
+
+logger = logging.getLogger(__name__)
+
+# Most queued writes the background writer commits in one transaction
+WRITE_BATCH_SIZE = 256
+
+# WAL lets the GUI keep reading while the writer commits; NORMAL only fsyncs at checkpoints
+CONNECTION_PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA cache_size=-16000',
+    'PRAGMA temp_store=MEMORY',
+)
+
+# Leaderboard rows kept in memory; get_high_scores and get_rank answer from here when they can
+TOP_SCORES_CACHE_SIZE = 100
+
+LEADERBOARD_PAGE_SIZE = 50
+
+# Summary columns written next to game_data, so saves can be filtered and sorted in SQL
+SAVE_METADATA_COLUMNS = (
+    ('turn', 'INTEGER'),
+    ('score', 'INTEGER'),
+    ('server_hp', 'INTEGER'),
+    ('points', 'INTEGER'),
+    ('threat_count', 'INTEGER'),
+    ('tool_count', 'INTEGER'),
+    ('game_over', 'INTEGER'),
+)
+
+SAVE_SORT_COLUMNS = ('save_name', 'updated_at') + tuple(name for name, _ in SAVE_METADATA_COLUMNS)
+
+# Fields of each row list_saves returns
+SAVE_LIST_FIELDS = ('save_name',) + tuple(name for name, _ in SAVE_METADATA_COLUMNS) + ('updated_at',)
+
+# What an SQLite INTEGER holds; summary columns saturate at these rather than refuse a save
+# whose game_data can still hold the exact values
+SQLITE_INT_MIN = -2 ** 63
+SQLITE_INT_MAX = 2 ** 63 - 1
+
+# Saves rewritten per transaction by migrate_save_format
+MIGRATE_BATCH_SIZE = 500
+
+# Rows per executemany / transaction in ingest_high_scores; also the most rows held in memory
+INGEST_BATCH_SIZE = 10000
+
+
+def save_metadata(game_state):
+    """Values for the SAVE_METADATA_COLUMNS, clamped to what an INTEGER column holds"""
+    values = (game_state.turn, game_state.score, game_state.server_hp, game_state.points,
+              len(game_state.active_threats), len(game_state.owned_tools), game_state.game_over)
+    return tuple(min(max(value, SQLITE_INT_MIN), SQLITE_INT_MAX) for value in values)
+
+
+class DatabaseManager:
+    def __init__(self, db_path='cybersecurity_game.db'):
+        self.db_path = db_path
+        self.conn = self.connect()
+        self.create_tables()
+        self.write_queue = queue.Queue()
+        self.writer = None
+        self.writer_lock = threading.Lock()
+        # Best TOP_SCORES_CACHE_SIZE scores as (player, score, turns, created_at), with
+        # (-score, id) sort keys alongside; None until first read. The writer thread updates it too.
+        # top_scores_version is this connection's data_version when the cache was loaded.
+        self.top_scores = None
+        self.top_score_keys = None
+        self.top_scores_version = None
+        self.top_scores_lock = threading.Lock()
+
+    def connect(self):
+        conn = sqlite3.connect(self.db_path)
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def create_tables(self):
+        cursor = self.conn.cursor()
+        cursor.execute('''
+                       CREATE TABLE IF NOT EXISTS game_saves
+                       (
+                           id
+                           INTEGER
+                           PRIMARY
+                           KEY
+                           AUTOINCREMENT,
+                           save_name
+                           TEXT
+                           UNIQUE
+                           NOT
+                           NULL,
+                           game_data
+                           TEXT
+                           NOT
+                           NULL,
+                           created_at
+                           TIMESTAMP
+                           DEFAULT
+                           CURRENT_TIMESTAMP,
+                           updated_at
+                           TIMESTAMP
+                           DEFAULT
+                           CURRENT_TIMESTAMP
+                       )
+                       ''')
+
+        cursor.execute('''
+                       CREATE TABLE IF NOT EXISTS high_scores
+                       (
+                           id
+                           INTEGER
+                           PRIMARY
+                           KEY
+                           AUTOINCREMENT,
+                           player_name
+                           TEXT
+                           NOT
+                           NULL,
+                           score
+                           INTEGER
+                           NOT
+                           NULL,
+                           turns_survived
+                           INTEGER
+                           NOT
+                           NULL,
+                           created_at
+                           TIMESTAMP
+                           DEFAULT
+                           CURRENT_TIMESTAMP
+                       )
+                       ''')
+
+        # Ties go to whoever got there first, so id breaks them
+        cursor.execute('''
+                       CREATE INDEX IF NOT EXISTS idx_high_scores_score
+                           ON high_scores (score DESC, id)
+                       ''')
+
+        # Autosave journal: per session, a snapshot followed by the per-turn deltas since it;
+        # seq numbers the entries one after another so recovery can tell where a write went missing
+        cursor.execute('''
+                       CREATE TABLE IF NOT EXISTS autosave_journal
+                       (
+                           id
+                           INTEGER
+                           PRIMARY
+                           KEY
+                           AUTOINCREMENT,
+                           session
+                           TEXT
+                           NOT
+                           NULL,
+                           turn
+                           INTEGER
+                           NOT
+                           NULL,
+                           kind
+                           TEXT
+                           NOT
+                           NULL,
+                           seq
+                           INTEGER,
+                           data
+                           BLOB
+                           NOT
+                           NULL
+                       )
+                       ''')
+        cursor.execute('PRAGMA table_info(autosave_journal)')
+        if 'seq' not in {row[1] for row in cursor.fetchall()}:
+            # Rows journalled before seq existed read back as NULL, which recovery treats as a break
+            cursor.execute('ALTER TABLE autosave_journal ADD COLUMN seq INTEGER')
+        cursor.execute('''
+                       CREATE INDEX IF NOT EXISTS idx_autosave_journal_session
+                           ON autosave_journal (session, id)
+                       ''')
+
+        # Saves are manifests of content-addressed chunks; each distinct chunk is stored once,
+        # and collect_garbage reads the manifests to find the ones no save uses any more.
+        # Chunks used to live in a WITHOUT ROWID table, where any chunk over a few hundred bytes
+        # spills into mostly empty overflow pages; move them into an ordinary table
+        cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'save_chunks'")
+        row = cursor.fetchone()
+        rebuild_chunks = bool(row) and 'WITHOUT ROWID' in row[0].upper()
+        if rebuild_chunks:
+            cursor.execute('ALTER TABLE save_chunks RENAME TO save_chunks_old')
+        cursor.execute('''
+                       CREATE TABLE IF NOT EXISTS save_chunks
+                       (
+                           hash
+                           BLOB
+                           PRIMARY
+                           KEY,
+                           data
+                           BLOB
+                           NOT
+                           NULL
+                       )
+                       ''')
+        if rebuild_chunks:
+            cursor.execute('INSERT INTO save_chunks (hash, data) SELECT hash, data FROM save_chunks_old')
+            cursor.execute('DROP TABLE save_chunks_old')
+        # Per-save chunk refs cost more space than the chunks they pointed at
+        cursor.execute('DROP TABLE IF EXISTS save_chunk_refs')
+
+        self.migrate_save_metadata(cursor)
+        for column in ('updated_at', 'turn', 'score'):
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_game_saves_' + column + ' ON game_saves (' + column + ')')
+        self.conn.commit()
+
+    def migrate_save_metadata(self, cursor):
+        """Add any missing metadata columns and fill them in for saves written without them"""
+        cursor.execute('PRAGMA table_info(game_saves)')
+        existing = {row[1] for row in cursor.fetchall()}
+        for name, column_type in SAVE_METADATA_COLUMNS:
+            if name not in existing:
+                cursor.execute('ALTER TABLE game_saves ADD COLUMN ' + name + ' ' + column_type)
+
+        # Older clients sharing the database can still write saves without metadata
+        cursor.execute('SELECT id, game_data FROM game_saves WHERE turn IS NULL')
+        rows = cursor.fetchall()
+        for row_id, game_data in rows:
+            game_state = self.decode_save(cursor, game_data)
+            cursor.execute('''
+                UPDATE game_saves
+                SET turn = ?, score = ?, server_hp = ?, points = ?, threat_count = ?, tool_count = ?, game_over = ?
+                WHERE id = ?
+            ''', save_metadata(game_state) + (row_id,))
+
+    def migrate_save_format(self, batch_size=MIGRATE_BATCH_SIZE):
+        """Rewrite JSON and single-blob binary saves as chunked saves, batch_size per commit
+
+        Returns how many changed. Loading never needs this, since the older
+        formats still load; it only makes them smaller and shares their chunks.
+        """
+        self.flush()
+        cursor = self.conn.cursor()
+        migrated = 0
+        last_id = 0
+        while True:
+            cursor.execute('''
+                SELECT id, save_name, game_data FROM game_saves
+                WHERE id > ? AND (typeof(game_data) = 'text' OR substr(game_data, 1, ?) != ?)
+                ORDER BY id LIMIT ?
+            ''', (last_id, len(MANIFEST_MAGIC), MANIFEST_MAGIC, batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                return migrated
+
+            for row_id, save_name, game_data in rows:
+                encoded = self.write_chunks(cursor, save_name, decode_game_state(game_data))
+                # States the packed layout can't hold stay as they are
+                if is_manifest(encoded):
+                    cursor.execute('UPDATE game_saves SET game_data = ? WHERE id = ?', (encoded, row_id))
+                    migrated += 1
+            self.conn.commit()
+            last_id = rows[-1][0]
+
+    def save_game(self, save_name, game_state):
+        # Let queued writes land first, so writes commit in the order they were made
+        self.flush()
+        cursor = self.conn.cursor()
+        self.write_game(cursor, save_name, game_state)
+        self.conn.commit()
+        return True
+
+    def write_game(self, cursor, save_name, game_state):
+        cursor.execute('''
+            INSERT OR REPLACE INTO game_saves
+                (save_name, game_data, updated_at,
+                 turn, score, server_hp, points, threat_count, tool_count, game_over)
+            VALUES (?, ?, CURRENT_TIMESTAMP, ?, ?, ?, ?, ?, ?, ?)
+        ''', (save_name, self.write_chunks(cursor, save_name, game_state)) + save_metadata(game_state))
+
+    def write_chunks(self, cursor, save_name, game_state):
+        """Store any chunks of game_state not already stored and return the save's game_data
+
+        That is the chunk manifest, or for a state the packed layout can't
+        hold, a self-contained encode_game_state save.
+        """
+        try:
+            manifest, chunks = encode_manifest(game_state)
+        except (struct.error, TypeError, ValueError):
+            return encode_game_state(game_state)
+
+        cursor.executemany('INSERT OR IGNORE INTO save_chunks (hash, data) VALUES (?, ?)', chunks.items())
+        return manifest
+
+    def decode_save(self, cursor, game_data):
+        """GameState from a save row's game_data, whichever format it was written in"""
+        if not is_manifest(game_data):
+            return decode_game_state(game_data)
+
+        hashes = list(set(manifest_hashes(game_data)))
+        cursor.execute('SELECT hash, data FROM save_chunks WHERE hash IN (' + ', '.join('?' * len(hashes)) + ')',
+                       hashes)
+        return decode_manifest(game_data, dict(cursor.fetchall()))
+
+    def delete_game(self, save_name):
+        """Remove a save; its chunks stay until collect_garbage finds nothing else uses them"""
+        self.flush()
+        cursor = self.conn.cursor()
+        cursor.execute('DELETE FROM game_saves WHERE save_name = ?', (save_name,))
+        self.conn.commit()
+
+    def collect_garbage(self, vacuum=False):
+        """Delete chunks no save refers to and return how many went; vacuum also shrinks the file"""
+        self.flush()
+        cursor = self.conn.cursor()
+        cursor.execute('CREATE TEMP TABLE IF NOT EXISTS live_chunks (hash BLOB PRIMARY KEY) WITHOUT ROWID')
+        cursor.execute('DELETE FROM live_chunks')
+        cursor.execute('SELECT game_data FROM game_saves')
+        for (game_data,) in cursor.fetchall():
+            if is_manifest(game_data):
+                cursor.executemany('INSERT OR IGNORE INTO live_chunks (hash) VALUES (?)',
+                                   [(digest,) for digest in manifest_hashes(game_data)])
+        cursor.execute('DELETE FROM save_chunks WHERE hash NOT IN (SELECT hash FROM live_chunks)')
+        removed = cursor.rowcount
+        cursor.execute('DELETE FROM live_chunks')
+        self.conn.commit()
+        if vacuum:
+            self.conn.execute('VACUUM')
+        return removed
+
+    def load_game(self, save_name):
+        self.flush()
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT game_data FROM game_saves WHERE save_name = ?', (save_name,))
+        result = cursor.fetchone()
+
+        if result:
+            return self.decode_save(cursor, result[0])
+        return None
+
+    def get_save_names(self):
+        self.flush()
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT save_name FROM game_saves ORDER BY updated_at DESC')
+        return [row[0] for row in cursor.fetchall()]
+
+    def list_saves(self, order_by='updated_at', descending=True, game_over=None, min_turn=None, limit=None):
+        """Save summaries as dicts of SAVE_LIST_FIELDS, filtered and sorted without loading any game_data"""
+        if order_by not in SAVE_SORT_COLUMNS:
+            raise ValueError("Unknown save column: " + order_by)
+
+        conditions = []
+        params = []
+        if game_over is not None:
+            conditions.append('game_over = ?')
+            params.append(game_over)
+        if min_turn is not None:
+            conditions.append('turn >= ?')
+            params.append(min_turn)
+
+        query = 'SELECT ' + ', '.join(SAVE_LIST_FIELDS) + ' FROM game_saves'
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        query += ' ORDER BY ' + order_by + (' DESC' if descending else '')
+        if limit is not None:
+            query += ' LIMIT ?'
+            params.append(limit)
+
+        self.flush()
+        cursor = self.conn.cursor()
+        cursor.execute(query, params)
+        return [dict(zip(SAVE_LIST_FIELDS, row)) for row in cursor.fetchall()]
+
+    def append_journal_async(self, session, turn, kind, seq, data, callback=None):
+        self.submit(('journal', session, turn, kind, seq, data), callback)
+
+    def write_journal(self, cursor, session, turn, kind, seq, data):
+        if kind == 'snapshot':
+            # Same transaction as the insert, so a crash leaves either the old chain or the new one
+            cursor.execute('DELETE FROM autosave_journal WHERE session = ?', (session,))
+        cursor.execute('''
+            INSERT INTO autosave_journal (session, turn, kind, seq, data)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (session, turn, kind, seq, data))
+
+    def read_journal(self, session):
+        """(turn, kind, seq, data) rows from the session's latest snapshot onwards, oldest first"""
+        self.flush()
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT turn, kind, seq, data FROM autosave_journal
+            WHERE session = ? AND id >= (
+                SELECT MAX(id) FROM autosave_journal WHERE session = ? AND kind = 'snapshot'
+            )
+            ORDER BY id
+        ''', (session, session))
+        return cursor.fetchall()
+
+    def clear_journal(self, session):
+        self.flush()
+        self.conn.execute('DELETE FROM autosave_journal WHERE session = ?', (session,))
+        self.conn.commit()
+
+    def save_high_score(self, player_name, score, turns):
+        self.flush()
+        cursor = self.conn.cursor()
+        row_id = self.write_high_score(cursor, player_name, score, turns)
+        self.conn.commit()
+        self.cache_high_score(self.conn, row_id, score)
+
+    def write_high_score(self, cursor, player_name, score, turns):
+        cursor.execute('''
+                       INSERT INTO high_scores (player_name, score, turns_survived)
+                       VALUES (?, ?, ?)
+                       ''', (player_name, score, turns))
+        return cursor.lastrowid
+
+    def ingest_high_scores(self, rows, batch_size=INGEST_BATCH_SIZE):
+        """Bulk-insert (player_name, score, turns) rows from any iterable, returns rows and rows/s
+
+        rows is consumed batch_size at a time, each batch one executemany and
+        one commit, so a generator of any length never has more than a batch
+        in memory and a failure only loses the batch in progress.
+        """
+        self.flush()
+        rows = iter(rows)
+        total = 0
+        start = time.perf_counter()
+        cursor = self.conn.cursor()
+
+        while True:
+            batch = list(itertools.islice(rows, batch_size))
+            if not batch:
+                break
+            cursor.executemany('''
+                               INSERT INTO high_scores (player_name, score, turns_survived)
+                               VALUES (?, ?, ?)
+                               ''', batch)
+            self.conn.commit()
+            total += len(batch)
+            self.invalidate_top_scores(max(row[1] for row in batch))
+
+        seconds = time.perf_counter() - start
+        return {'rows': total, 'seconds': seconds, 'rows_per_s': total / seconds if seconds else 0.0}
+
+    def get_high_scores(self, limit=10, offset=0):
+        self.flush()
+        if offset + limit <= TOP_SCORES_CACHE_SIZE:
+            top_scores, _ = self.load_top_scores()
+            return top_scores[offset:offset + limit]
+
+        cursor = self.conn.cursor()
+        cursor.execute('''
+                       SELECT player_name, score, turns_survived, created_at
+                       FROM high_scores
+                       ORDER BY score DESC, id LIMIT ? OFFSET ?
+                       ''', (limit, offset))
+        return cursor.fetchall()
+
+    def get_high_scores_page(self, after=None, limit=LEADERBOARD_PAGE_SIZE):
+        """One page of the leaderboard, plus the cursor to pass as after for the next page
+
+        Pages are found by seeking the score index from the last row seen, so
+        page 10,000 costs the same as page 1. The cursor is None after the last page.
+        """
+        self.flush()
+        if after is None and limit <= TOP_SCORES_CACHE_SIZE:
+            top_scores, keys = self.load_top_scores()
+            top_scores = top_scores[:limit]
+            keys = keys[:limit]
+            next_after = (-keys[-1][0], keys[-1][1]) if len(keys) == limit else None
+            return top_scores, next_after
+
+        cursor = self.conn.cursor()
+        if after is None:
+            cursor.execute('''
+                           SELECT id, player_name, score, turns_survived, created_at
+                           FROM high_scores
+                           ORDER BY score DESC, id LIMIT ?
+                           ''', (limit,))
+        else:
+            score, row_id = after
+            cursor.execute('''
+                           SELECT id, player_name, score, turns_survived, created_at
+                           FROM high_scores
+                           WHERE score <= ? AND (score < ? OR id > ?)
+                           ORDER BY score DESC, id LIMIT ?
+                           ''', (score, score, row_id, limit))
+        rows = cursor.fetchall()
+
+        next_after = (rows[-1][2], rows[-1][0]) if len(rows) == limit else None
+        return [row[1:] for row in rows], next_after
+
+    def get_rank(self, score):
+        """Leaderboard position a score would take; equal scores share the better rank"""
+        self.flush()
+        top_scores, keys = self.load_top_scores()
+        if len(top_scores) < TOP_SCORES_CACHE_SIZE or score > top_scores[-1][1]:
+            return bisect.bisect_left(keys, (-score,)) + 1
+
+        # Counted off the covering score index, without touching the table
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT COUNT(*) FROM high_scores WHERE score > ?', (score,))
+        return cursor.fetchone()[0] + 1
+
+    def load_top_scores(self):
+        """Copies of the cached top scores and their keys, taken together, reloading first if they may be stale"""
+        # data_version moves whenever another connection commits, be it another
+        # process sharing the database or this one's writer thread, but not for our own commits
+        data_version = self.conn.execute('PRAGMA data_version').fetchone()[0]
+        with self.top_scores_lock:
+            if self.top_scores is None or data_version != self.top_scores_version:
+                cursor = self.conn.cursor()
+                cursor.execute('''
+                               SELECT id, player_name, score, turns_survived, created_at
+                               FROM high_scores
+                               ORDER BY score DESC, id LIMIT ?
+                               ''', (TOP_SCORES_CACHE_SIZE,))
+                rows = cursor.fetchall()
+                self.top_scores = [row[1:] for row in rows]
+                self.top_score_keys = [(-row[2], row[0]) for row in rows]
+                self.top_scores_version = data_version
+            return list(self.top_scores), list(self.top_score_keys)
+
+    def invalidate_top_scores(self, best_score):
+        """Drop the cached top scores if a score this good may belong in them"""
+        with self.top_scores_lock:
+            top_scores = self.top_scores
+            if top_scores is not None and (len(top_scores) < TOP_SCORES_CACHE_SIZE or best_score > top_scores[-1][1]):
+                self.top_scores = None
+                self.top_score_keys = None
+
+    def cache_high_score(self, conn, row_id, score):
+        """Slot a newly committed score into the cached top scores, if it made the cut"""
+        with self.top_scores_lock:
+            top_scores = self.top_scores
+            if top_scores is None:
+                return
+            # A new row has the highest id, so it loses ties with everything cached
+            if len(top_scores) >= TOP_SCORES_CACHE_SIZE and score <= top_scores[-1][1]:
+                return
+
+            row = conn.execute('''
+                               SELECT player_name, score, turns_survived, created_at
+                               FROM high_scores
+                               WHERE id = ?
+                               ''', (row_id,)).fetchone()
+            key = (-score, row_id)
+            index = bisect.bisect(self.top_score_keys, key)
+            self.top_score_keys.insert(index, key)
+            top_scores.insert(index, row)
+            del self.top_score_keys[TOP_SCORES_CACHE_SIZE:]
+            del top_scores[TOP_SCORES_CACHE_SIZE:]
+
+    def save_game_async(self, save_name, game_state, callback=None):
+        """Queue a save for the background writer
+
+        The state is forked now, so later moves don't leak into the save.
+        callback(ok, error) runs on the writer thread once the batch holding
+        this save has committed; GUI code has to hand it back to Tk itself.
+        """
+        self.submit(('game', save_name, game_state.fork()), callback)
+
+    def save_high_score_async(self, player_name, score, turns, callback=None):
+        self.submit(('score', player_name, score, turns), callback)
+
+    def submit(self, write, callback):
+        if self.db_path == ':memory:':
+            # A second connection would see a different in-memory database, so write inline
+            self.apply_writes(self.conn, [(write, callback)])
+            return
+        # The turbo worker journals from its own thread, so two threads can get here first
+        with self.writer_lock:
+            if self.writer is None:
+                self.writer = threading.Thread(target=self.writer_loop, name='db-writer', daemon=True)
+                self.writer.start()
+        self.write_queue.put((write, callback))
+
+    def writer_loop(self):
+        conn = self.connect()
+        while True:
+            batch = [self.write_queue.get()]
+            while len(batch) < WRITE_BATCH_SIZE:
+                try:
+                    batch.append(self.write_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = any(item is None for item in batch)
+            writes = [item for item in batch if item is not None]
+            try:
+                if writes:
+                    self.apply_writes(conn, writes)
+            except Exception:
+                logger.exception("Database writer failed on a batch of %d writes", len(writes))
+            finally:
+                # Even a batch that went wrong counts as done, or flush() would wait on it forever
+                for _ in batch:
+                    self.write_queue.task_done()
+            if stop:
+                conn.close()
+                return
+
+    def apply_writes(self, conn, writes):
+        """Commit a batch of queued writes in one transaction, then report to each callback"""
+        error = None
+        new_scores = []
+        try:
+            cursor = conn.cursor()
+            for write, callback in writes:
+                if write[0] == 'game':
+                    self.write_game(cursor, write[1], write[2])
+                elif write[0] == 'journal':
+                    self.write_journal(cursor, *write[1:])
+                else:
+                    new_scores.append((self.write_high_score(cursor, write[1], write[2], write[3]), write[2]))
+            conn.commit()
+        except Exception as e:
+            # Report any failure back to the callbacks instead of killing the writer thread
+            conn.rollback()
+            error = e
+            new_scores = []
+
+        # Neither a cache update nor a caller's callback may take the writer thread down
+        for row_id, score in new_scores:
+            try:
+                self.cache_high_score(conn, row_id, score)
+            except Exception:
+                logger.exception("Could not update the cached top scores")
+                # It may be half updated, so read it afresh next time
+                with self.top_scores_lock:
+                    self.top_scores = None
+                    self.top_score_keys = None
+
+        for write, callback in writes:
+            if callback is not None:
+                try:
+                    callback(error is None, error)
+                except Exception:
+                    logger.exception("Database write callback failed")
+
+    def flush(self):
+        """Block until every queued write has been committed"""
+        if self.writer is not None:
+            self.write_queue.join()
+
+    def close(self):
+        if self.writer is not None:
+            self.write_queue.put(None)
+            self.writer.join()
+            self.writer = None
+        self.conn.close()
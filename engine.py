@@ -0,0 +1,885 @@
+import copy
+import functools
+import json
+import random
+import time
+import types
+
+
+class ThreatType:
+    # Small integer codes inside the engine; names are only for display and saves
+    VIRUS = 0
+    WORM = 1
+    TROJAN = 2
+    RANSOMWARE = 3
+    DDOS = 4
+    SPYWARE = 5
+    ZERO_DAY = 6
+    BOTNET = 7
+    PHISHING = 8
+    MALWARE_DROPPER = 9
+    DATA_BREACH = 10
+    BRUTE_FORCE = 11
+    MITM = 12
+    SOCIAL_ENGINEERING = 13
+    SQL_INJECTION = 14
+    KEYLOGGER = 15
+    BOT_COMMANDER = 16
+
+
+class ToolType:
+    BASIC_FIREWALL = 0
+    ADVANCED_FIREWALL = 1
+    ANTIVIRUS_SCANNER = 2
+    HEURISTIC_ANTIVIRUS = 3
+    BACKUP_SYSTEM = 4
+    IDS = 5
+    IPS = 6
+    ENCRYPTION_MODULE = 7
+    EMAIL_FILTER = 8
+    SANDBOX_ENVIRONMENT = 9
+    HONEYPOT = 10
+    BEHAVIOURAL_MONITORING = 11
+    ANTI_BOTNET_TOOL = 12
+    PORT_SCANNER = 13
+    VPN_SECURITY_LAYER = 14
+    CLOUD_SHIELD = 15
+
+
+THREAT_NAMES = [
+    "Virus",
+    "Worm",
+    "Trojan",
+    "Ransomware",
+    "DDoS Attack",
+    "Spyware",
+    "Zero-Day Exploit",
+    "Botnet",
+    "Phishing Attack",
+    "Malware Dropper",
+    "Data Breach",
+    "Brute Force Attack",
+    "MITM",
+    "Social Engineering Attack",
+    "SQL Injection Attack",
+    "Keylogger",
+    "Bot Commander",
+]
+
+TOOL_NAMES = [
+    "Basic Firewall",
+    "Advanced Firewall",
+    "Antivirus Scanner",
+    "Heuristic Antivirus",
+    "Backup System",
+    "IDS",
+    "IPS",
+    "Encryption Module",
+    "Email Filter",
+    "Sandbox Environment",
+    "Honeypot",
+    "Behavioural Monitoring",
+    "Anti-Botnet Tool",
+    "Port Scanner",
+    "VPN Security Layer",
+    "Cloud Shield",
+]
+
+THREAT_CODES = {name: code for code, name in enumerate(THREAT_NAMES)}
+TOOL_CODES = {name: code for code, name in enumerate(TOOL_NAMES)}
+
+
+def threat_code(value):
+    """Threat code from a saved value; old saves store the display name"""
+    if isinstance(value, str):
+        return THREAT_CODES[value]
+    return value
+
+
+def tool_code(value):
+    """Tool code from a saved value; old saves store the display name"""
+    if isinstance(value, str):
+        return TOOL_CODES[value]
+    return value
+
+
+class Threat:
+    __slots__ = ('type', 'hp', 'max_hp', 'attack', 'special_active', 'turns_alive', 'detection_chance')
+
+    def __init__(self, threat_type, hp, max_hp, attack, special_active=False, turns_alive=0, detection_chance=1.0):
+        self.type = threat_type
+        self.hp = hp
+        self.max_hp = max_hp
+        self.attack = attack
+        self.special_active = special_active
+        self.turns_alive = turns_alive
+        self.detection_chance = detection_chance
+
+    def copy(self):
+        clone = Threat.__new__(Threat)
+        clone.type = self.type
+        clone.hp = self.hp
+        clone.max_hp = self.max_hp
+        clone.attack = self.attack
+        clone.special_active = self.special_active
+        clone.turns_alive = self.turns_alive
+        clone.detection_chance = self.detection_chance
+        return clone
+
+
+class Tool:
+    __slots__ = ('type', 'effectiveness', 'cost', 'owned')
+
+    def __init__(self, tool_type, effectiveness, cost, owned=False):
+        self.type = tool_type
+        self.effectiveness = effectiveness
+        self.cost = cost
+        self.owned = owned
+
+
+class GameState:
+    __slots__ = ('server_hp', 'max_server_hp', 'points', 'score', 'turn', 'active_threats', 'owned_tools',
+                 'game_over', 'points_multiplier', 'tool_effectiveness_multiplier', 'shop_price_multiplier',
+                 'botnet_buff', 'scans_this_turn', 'tools_used_this_turn', 'purchases_this_turn')
+
+    def __init__(self):
+        self.server_hp = 100
+        self.max_server_hp = 100
+        self.points = 50
+        self.score = 0
+        self.turn = 1
+        self.active_threats = []
+        self.owned_tools = []
+        self.game_over = False
+        self.points_multiplier = 1.0
+        self.tool_effectiveness_multiplier = 1.0
+        self.shop_price_multiplier = 1.0
+        self.botnet_buff = 0
+        self.scans_this_turn = 0
+        self.tools_used_this_turn = 0
+        self.purchases_this_turn = 0
+
+    def fork(self):
+        """Independent copy for lookahead search, much cheaper than copy.deepcopy
+
+        Scalars are copied, owned_tools is a shallow copy (tool types are
+        immutable) and every threat is copied field by field, so the fork can
+        be played forward and simply dropped to roll back.
+        """
+        clone = GameState.__new__(GameState)
+        for name in GameState.__slots__:
+            setattr(clone, name, getattr(self, name))
+        clone.active_threats = [threat.copy() for threat in self.active_threats]
+        clone.owned_tools = list(self.owned_tools)
+        return clone
+
+
+BASE_DAMAGE = 20
+
+ALL_THREAT_TYPES = [ThreatType.VIRUS, ThreatType.WORM, ThreatType.TROJAN, ThreatType.RANSOMWARE,
+                    ThreatType.DDOS, ThreatType.SPYWARE, ThreatType.ZERO_DAY, ThreatType.BOTNET,
+                    ThreatType.PHISHING, ThreatType.MALWARE_DROPPER, ThreatType.DATA_BREACH,
+                    ThreatType.BRUTE_FORCE, ThreatType.MITM, ThreatType.SOCIAL_ENGINEERING,
+                    ThreatType.SQL_INJECTION, ThreatType.KEYLOGGER, ThreatType.BOT_COMMANDER]
+
+STARTING_TOOLS = [ToolType.BASIC_FIREWALL, ToolType.ANTIVIRUS_SCANNER]
+
+
+def virus_turn(engine, threat):
+    # Virus: Splits into 2 if ignored for 3 turns
+    if threat.turns_alive >= 3 and not threat.special_active:
+        threat.special_active = True
+        return [Threat(ThreatType.VIRUS, threat.hp // 2, threat.max_hp // 2, threat.attack // 2)]
+    return None
+
+
+def brute_force_turn(engine, threat):
+    # Brute Force: Damage increases over time
+    threat.attack += 2
+    return None
+
+
+def ransomware_turn(engine, threat):
+    # Ransomware: Doubles damage if not stopped within 2 turns
+    if threat.turns_alive >= 2 and not threat.special_active:
+        threat.attack *= 2
+        threat.special_active = True
+    return None
+
+
+def worm_attack(engine, threat):
+    # Attacks twice
+    return threat.attack * 2
+
+
+def spyware_attack(engine, threat):
+    engine.game_state.points_multiplier *= 0.95
+    return threat.attack
+
+
+def data_breach_attack(engine, threat):
+    engine.game_state.max_server_hp = max(10, engine.game_state.max_server_hp - 2)
+    return threat.attack
+
+
+def mitm_attack(engine, threat):
+    engine.game_state.tool_effectiveness_multiplier *= 0.98
+    return threat.attack
+
+
+def social_engineering_attack(engine, threat):
+    engine.game_state.shop_price_multiplier *= 1.02
+    return threat.attack
+
+
+def keylogger_attack(engine, threat):
+    engine.game_state.points_multiplier *= 0.97
+    return threat.attack
+
+
+def bot_commander_attack(engine, threat):
+    engine.game_state.botnet_buff += 1
+    return threat.attack
+
+
+def malware_dropper_defeated(engine, threat):
+    # Spawns another threat
+    new_threat_type = engine.rng.choice(engine.threat_sampler.choices)
+    return [Threat(new_threat_type, 10, 10, 5)]
+
+
+# Phases a threat behaviour can hook into. Every hook is called as hook(engine, threat):
+#   turn      - after turns_alive is bumped in next_turn; returns new threats or None
+#   attack    - during process_threat_attacks; returns the damage this threat deals
+#   defeated  - when the threat is swept at 0 HP; returns new threats or None
+BEHAVIOUR_PHASES = ('turn', 'attack', 'defeated')
+
+
+def add_threat_type(name):
+    """Register a custom threat type and return its code
+
+    Give it a spawn weight with GameEngine.set_threat_weight and rules with
+    GameEngine.register_behaviour. Tools do the default 0.1 effectiveness
+    against it unless their effectiveness dict names its code; engines pick
+    the new type up in their damage table on the next lookup.
+    """
+    if name in THREAT_CODES:
+        return THREAT_CODES[name]
+    THREAT_NAMES.append(name)
+    THREAT_CODES[name] = len(THREAT_NAMES) - 1
+    return THREAT_CODES[name]
+
+
+class ThreatSampler:
+    """Alias-method sampler over threat weights: O(1) per draw after an O(n) build"""
+
+    def __init__(self, weights):
+        self.choices = list(weights.keys())
+        count = len(self.choices)
+        total = sum(weights.values())
+        scaled = [weight * count / total for weight in weights.values()]
+
+        self.prob = [1.0] * count
+        self.alias = list(range(count))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            self.prob[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            if scaled[more] < 1.0:
+                small.append(more)
+            else:
+                large.append(more)
+
+        # Whatever is left over is 1.0 up to rounding error
+        for i in small + large:
+            self.prob[i] = 1.0
+
+    def sample(self, rng, count):
+        """Draw count threat types in one call"""
+        choices = self.choices
+        prob = self.prob
+        alias = self.alias
+        n = len(choices)
+        random = rng.random
+        result = []
+        for _ in range(count):
+            u = random() * n
+            i = int(u)
+            result.append(choices[i] if u - i < prob[i] else choices[alias[i]])
+        return result
+
+
+ENGINE_PHASES = ('generate_threats', 'use_tool', 'process_threat_specials', 'process_threat_attacks',
+                 'process_defeated_threats', 'next_turn')
+
+ENGINE_COUNTERS = ('spawned', 'split', 'dropped', 'defeated')
+
+# Player-level calls an attached recorder logs; together these reproduce a game from its seed
+RECORDED_ACTIONS = ('scan', 'use_tool', 'buy_tool', 'process_defeated_threats', 'process_threat_attacks',
+                    'next_turn', 'new_game')
+
+
+class EngineStats:
+    """Wall time and call counts per engine phase, plus threat counters
+
+    Snapshots are plain dicts, so stats from many games or worker processes
+    can be added together with merge.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.calls = dict.fromkeys(ENGINE_PHASES, 0)
+        self.seconds = dict.fromkeys(ENGINE_PHASES, 0.0)
+        self.counters = dict.fromkeys(ENGINE_COUNTERS, 0)
+
+    def add_time(self, phase, seconds):
+        self.calls[phase] += 1
+        self.seconds[phase] += seconds
+
+    def count(self, counter, amount=1):
+        self.counters[counter] += amount
+
+    def snapshot(self):
+        phases = {}
+        for phase in ENGINE_PHASES:
+            calls = self.calls[phase]
+            phases[phase] = {
+                'calls': calls,
+                'total_s': self.seconds[phase],
+                'mean_us': self.seconds[phase] * 1e6 / calls if calls else 0.0,
+            }
+        return {'phases': phases, 'counters': dict(self.counters)}
+
+    def merge(self, snapshot):
+        for phase, numbers in snapshot['phases'].items():
+            self.calls[phase] += numbers['calls']
+            self.seconds[phase] += numbers['total_s']
+        for counter, amount in snapshot['counters'].items():
+            self.counters[counter] += amount
+
+    def export(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+
+def timed_phase(stats, phase, method):
+    """method wrapped to time every call into stats under phase"""
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            stats.add_time(phase, time.perf_counter() - start)
+    return wrapper
+
+
+def recorded_action(engine, recorder, action, method):
+    """method wrapped to log every call into recorder under action"""
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        recorder.before(engine, action, args, kwargs)
+        try:
+            return method(*args, **kwargs)
+        finally:
+            recorder.after(engine, action)
+    return wrapper
+
+
+class GameEngine:
+    """Headless game rules: no GUI and no disk I/O"""
+
+    def __init__(self, seed=None):
+        # Each engine owns its RNG so parallel games stay independent and reproducible
+        self.rng = random.Random(seed)
+        self.seed = seed
+        self.stats = None
+        self.recorder = None
+        self.tools_data = self.initialise_tools()
+        self.threat_weights = self.initialise_threat_weights()
+        self.damage_multiplier = None
+        self.best_tools = []
+        self.best_tools_owned = None
+        self.best_tools_count = 0
+        self.behaviours = self.initialise_behaviours()
+        self.new_game()
+
+    @property
+    def behaviours(self):
+        return self._behaviours
+
+    @behaviours.setter
+    def behaviours(self, behaviours):
+        # Flatten into one lookup per phase so the turn loops only ever do a dict get
+        self._behaviours = behaviours
+        self.turn_hooks = {}
+        self.attack_hooks = {}
+        self.defeated_hooks = {}
+        phase_hooks = {'turn': self.turn_hooks, 'attack': self.attack_hooks, 'defeated': self.defeated_hooks}
+        for threat_type, hooks in behaviours.items():
+            for phase, hook in hooks.items():
+                phase_hooks[phase][threat_type] = hook
+
+    def register_behaviour(self, threat_type, **hooks):
+        """Add or replace phase hooks for one threat type, e.g. register_behaviour(code, attack=func)"""
+        for phase in hooks:
+            if phase not in BEHAVIOUR_PHASES:
+                raise ValueError("Unknown behaviour phase: " + phase)
+        behaviours = {key: dict(value) for key, value in self._behaviours.items()}
+        behaviours.setdefault(threat_type, {}).update(hooks)
+        self.behaviours = behaviours
+
+    @property
+    def threat_weights(self):
+        # The sampler is only rebuilt when the weights are replaced, so callers get a
+        # read-only view: an in-place edit fails instead of being silently ignored.
+        # The engine itself keeps a plain dict, so it still copies and pickles.
+        return types.MappingProxyType(self._threat_weights)
+
+    @threat_weights.setter
+    def threat_weights(self, weights):
+        self._threat_weights = dict(weights)
+        self.threat_sampler = ThreatSampler(self._threat_weights)
+
+    def set_threat_weight(self, threat_type, weight):
+        weights = dict(self._threat_weights)
+        weights[threat_type] = weight
+        self.threat_weights = weights
+
+    def initialise_tools(self):
+        tools = {}
+
+        # Basic Firewall
+        tools[ToolType.BASIC_FIREWALL] = Tool(
+            ToolType.BASIC_FIREWALL,
+            {ThreatType.VIRUS: 0.5, ThreatType.WORM: 0.2, ThreatType.DDOS: 1.0},
+            10
+        )
+
+        # Advanced Firewall
+        tools[ToolType.ADVANCED_FIREWALL] = Tool(
+            ToolType.ADVANCED_FIREWALL,
+            {ThreatType.VIRUS: 0.8, ThreatType.WORM: 0.4, ThreatType.DDOS: 1.2},
+            20
+        )
+
+        # Antivirus Scanner
+        tools[ToolType.ANTIVIRUS_SCANNER] = Tool(
+            ToolType.ANTIVIRUS_SCANNER,
+            {ThreatType.VIRUS: 1.0, ThreatType.TROJAN: 1.0, ThreatType.WORM: 0.6},
+            15
+        )
+
+        # Heuristic Antivirus
+        tools[ToolType.HEURISTIC_ANTIVIRUS] = Tool(
+            ToolType.HEURISTIC_ANTIVIRUS,
+            {ThreatType.VIRUS: 1.2, ThreatType.TROJAN: 0.8, ThreatType.WORM: 0.8, ThreatType.ZERO_DAY: 0.4},
+            25
+        )
+
+        # Backup System
+        tools[ToolType.BACKUP_SYSTEM] = Tool(
+            ToolType.BACKUP_SYSTEM,
+            {ThreatType.RANSOMWARE: 1.2, ThreatType.TROJAN: 0.5, ThreatType.VIRUS: 0.3},
+            20
+        )
+
+        # Intrusion Detection System
+        ids_effectiveness = {}
+        for threat in ALL_THREAT_TYPES:
+            ids_effectiveness[threat] = 0.3
+
+        tools[ToolType.IDS] = Tool(
+            ToolType.IDS,
+            ids_effectiveness,
+            15
+        )
+
+        # Intrusion Prevention System
+        tools[ToolType.IPS] = Tool(
+            ToolType.IPS,
+            {ThreatType.DDOS: 1.3, ThreatType.BRUTE_FORCE: 1.0, ThreatType.WORM: 0.6},
+            30
+        )
+
+        # Encryption Module
+        tools[ToolType.ENCRYPTION_MODULE] = Tool(
+            ToolType.ENCRYPTION_MODULE,
+            {ThreatType.DATA_BREACH: 1.2, ThreatType.SPYWARE: 1.0},
+            20
+        )
+
+        # Email Filter
+        tools[ToolType.EMAIL_FILTER] = Tool(
+            ToolType.EMAIL_FILTER,
+            {ThreatType.PHISHING: 1.3, ThreatType.TROJAN: 0.3},
+            12
+        )
+
+        # Sandbox Environment
+        tools[ToolType.SANDBOX_ENVIRONMENT] = Tool(
+            ToolType.SANDBOX_ENVIRONMENT,
+            {ThreatType.ZERO_DAY: 1.0, ThreatType.VIRUS: 0.5},
+            30
+        )
+
+        # Honeypot
+        tools[ToolType.HONEYPOT] = Tool(
+            ToolType.HONEYPOT,
+            {ThreatType.RANSOMWARE: 0.5, ThreatType.WORM: 1.0, ThreatType.BOTNET: 0.7},
+            18
+        )
+
+        # Behavioural Monitoring
+        tools[ToolType.BEHAVIOURAL_MONITORING] = Tool(
+            ToolType.BEHAVIOURAL_MONITORING,
+            {ThreatType.SPYWARE: 1.3, ThreatType.TROJAN: 0.8},
+            18
+        )
+
+        # Anti-Botnet Tool
+        tools[ToolType.ANTI_BOTNET_TOOL] = Tool(
+            ToolType.ANTI_BOTNET_TOOL,
+            {ThreatType.BOTNET: 1.4, ThreatType.DDOS: 0.8},
+            25
+        )
+
+        # Port Scanner
+        tools[ToolType.PORT_SCANNER] = Tool(
+            ToolType.PORT_SCANNER,
+            {ThreatType.BRUTE_FORCE: 0.9, ThreatType.WORM: 0.4},
+            10
+        )
+
+        # VPN Security Layer
+        tools[ToolType.VPN_SECURITY_LAYER] = Tool(
+            ToolType.VPN_SECURITY_LAYER,
+            {ThreatType.DATA_BREACH: 0.9, ThreatType.MITM: 1.2},
+            25
+        )
+
+        # Cloud Shield
+        tools[ToolType.CLOUD_SHIELD] = Tool(
+            ToolType.CLOUD_SHIELD,
+            {ThreatType.DDOS: 1.4, ThreatType.BOTNET: 1.0},
+            30
+        )
+
+        return tools
+
+    def initialise_threat_weights(self):
+        return {
+            ThreatType.VIRUS: 1.0,
+            ThreatType.WORM: 0.8,
+            ThreatType.TROJAN: 0.9,
+            ThreatType.RANSOMWARE: 0.6,
+            ThreatType.DDOS: 0.7,
+            ThreatType.SPYWARE: 0.8,
+            ThreatType.ZERO_DAY: 0.3,
+            ThreatType.BOTNET: 0.5,
+            ThreatType.PHISHING: 0.9,
+            ThreatType.MALWARE_DROPPER: 0.6,
+            ThreatType.DATA_BREACH: 0.4,
+            ThreatType.BRUTE_FORCE: 0.7,
+            ThreatType.MITM: 0.5,
+            ThreatType.SOCIAL_ENGINEERING: 0.4,
+            ThreatType.SQL_INJECTION: 0.6,
+            ThreatType.KEYLOGGER: 0.7,
+            ThreatType.BOT_COMMANDER: 0.2
+        }
+
+    def initialise_behaviours(self):
+        return {
+            ThreatType.VIRUS: {'turn': virus_turn},
+            ThreatType.BRUTE_FORCE: {'turn': brute_force_turn},
+            ThreatType.RANSOMWARE: {'turn': ransomware_turn},
+            ThreatType.WORM: {'attack': worm_attack},
+            ThreatType.SPYWARE: {'attack': spyware_attack},
+            ThreatType.DATA_BREACH: {'attack': data_breach_attack},
+            ThreatType.MITM: {'attack': mitm_attack},
+            ThreatType.SOCIAL_ENGINEERING: {'attack': social_engineering_attack},
+            ThreatType.KEYLOGGER: {'attack': keylogger_attack},
+            ThreatType.BOT_COMMANDER: {'attack': bot_commander_attack},
+            ThreatType.MALWARE_DROPPER: {'defeated': malware_dropper_defeated},
+        }
+
+    def generate_threats(self, threat_count=None):
+        if threat_count is None:
+            threat_count = min(1 + self.game_state.turn // 3, 4)
+        threat_types = self.threat_sampler.sample(self.rng, threat_count)
+        if self.stats is not None:
+            self.stats.count('spawned', threat_count)
+        return [self.create_threat(threat_type) for threat_type in threat_types]
+
+    def generate_waves(self, wave_count, threat_count=None):
+        """Generate several waves from a single batched draw"""
+        if threat_count is None:
+            threat_count = min(1 + self.game_state.turn // 3, 4)
+        if threat_count == 0:
+            return [[] for _ in range(wave_count)]
+        threat_types = self.threat_sampler.sample(self.rng, wave_count * threat_count)
+        if self.stats is not None:
+            self.stats.count('spawned', len(threat_types))
+        threats = [self.create_threat(threat_type) for threat_type in threat_types]
+        return [threats[i:i + threat_count] for i in range(0, len(threats), threat_count)]
+
+    def create_threat(self, threat_type):
+        base_hp = 15 + (self.game_state.turn * 2)
+        base_attack = 5 + self.game_state.turn
+
+        # Apply botnet buff if applicable
+        if threat_type == ThreatType.BOTNET:
+            base_hp += self.game_state.botnet_buff * 5
+            base_attack += self.game_state.botnet_buff * 2
+
+        threat = Threat(
+            threat_type,
+            base_hp,
+            base_hp,
+            base_attack
+        )
+
+        # Special properties
+        if threat_type == ThreatType.TROJAN:
+            threat.detection_chance = 0.7
+
+        return threat
+
+    def scan(self):
+        """Scan for a new wave of threats, keeping only the detected ones"""
+        if self.game_state.scans_this_turn >= 2:
+            return {"error": "You can only scan twice per turn."}
+
+        new_threats = self.generate_threats()
+
+        # Apply detection chances
+        detected_threats = []
+        for threat in new_threats:
+            if self.rng.random() < threat.detection_chance:
+                detected_threats.append(threat)
+
+        self.game_state.active_threats.extend(detected_threats)
+        self.game_state.scans_this_turn += 1
+
+        return {"detected": detected_threats}
+
+    def refresh_damage_table(self):
+        """Precompute effectiveness and damage for every tool against every threat type"""
+        multiplier = self.game_state.tool_effectiveness_multiplier
+        self.damage_table = [None] * len(TOOL_NAMES)
+        for tool_type, tool in self.tools_data.items():
+            row = []
+            for threat_type in range(len(THREAT_NAMES)):
+                effectiveness = tool.effectiveness.get(threat_type, 0.1)
+                effectiveness *= multiplier
+                row.append((effectiveness, int(BASE_DAMAGE * effectiveness)))
+            self.damage_table[tool_type] = row
+        self.damage_multiplier = multiplier
+
+    def tool_damage(self, tool_type, threat_type):
+        """Return (effectiveness, damage) for one attack, rebuilding the table if the multiplier moved"""
+        if self.game_state.tool_effectiveness_multiplier != self.damage_multiplier:
+            self.refresh_damage_table()
+        row = self.damage_table[tool_type]
+        if threat_type >= len(row):
+            # add_threat_type registered this type after the table was built
+            self.refresh_damage_table()
+            row = self.damage_table[tool_type]
+        return row[threat_type]
+
+    def best_tool_for(self, threat_type):
+        """Most effective owned tool against a threat type, or None if no tools are owned"""
+        owned_tools = self.game_state.owned_tools
+        # Tools are only ever appended, or the whole list replaced on new game/load
+        if (owned_tools is not self.best_tools_owned or len(owned_tools) != self.best_tools_count
+                or len(self.best_tools) != len(THREAT_NAMES)):
+            self.best_tools = []
+            for candidate in range(len(THREAT_NAMES)):
+                best = None
+                for tool_type in owned_tools:
+                    effectiveness = self.tools_data[tool_type].effectiveness.get(candidate, 0.1)
+                    if best is None or effectiveness > best[0]:
+                        best = (effectiveness, tool_type)
+                self.best_tools.append(best[1] if best else None)
+            self.best_tools_owned = owned_tools
+            self.best_tools_count = len(owned_tools)
+        return self.best_tools[threat_type]
+
+    def use_tool(self, tool_type, target_threat):
+        if tool_type not in self.game_state.owned_tools:
+            return {"error": "Tool not owned"}
+
+        effectiveness, damage = self.tool_damage(tool_type, target_threat.type)
+
+        # Apply damage
+        target_threat.hp = max(0, target_threat.hp - damage)
+
+        result = {
+            "damage": damage,
+            "threat_defeated": target_threat.hp <= 0,
+            "effectiveness": effectiveness
+        }
+
+        return result
+
+    def process_threat_specials(self):
+        """Process special abilities of threats"""
+        new_threats = []
+        turn_hooks = self.turn_hooks
+
+        for threat in self.game_state.active_threats:
+            threat.turns_alive += 1
+
+            hook = turn_hooks.get(threat.type)
+            if hook is not None:
+                spawned = hook(self, threat)
+                if spawned:
+                    new_threats.extend(spawned)
+
+        self.game_state.active_threats.extend(new_threats)
+        if self.stats is not None:
+            self.stats.count('split', len(new_threats))
+
+    def process_threat_attacks(self):
+        """Process threat attacks and special effects"""
+        total_damage = 0
+        attack_hooks = self.attack_hooks
+
+        for threat in self.game_state.active_threats:
+            hook = attack_hooks.get(threat.type)
+            if hook is None:
+                total_damage += threat.attack
+            else:
+                total_damage += hook(self, threat)
+
+        self.game_state.server_hp = max(0, self.game_state.server_hp - total_damage)
+
+        if self.game_state.server_hp <= 0:
+            self.game_state.game_over = True
+
+    def process_defeated_threats(self):
+        """Process effects when threats are defeated"""
+        points_earned = 0
+        new_threats = []
+        survivors = []
+
+        # Base points for defeating threat
+        base_points = 10 + (self.game_state.turn * 2)
+        threat_points = int(base_points * self.game_state.points_multiplier)
+        defeated_hooks = self.defeated_hooks
+
+        # Single compaction pass: survivors keep their order, dead threats are dropped
+        for threat in self.game_state.active_threats:
+            if threat.hp > 0:
+                survivors.append(threat)
+                continue
+
+            points_earned += threat_points
+
+            # Special death effects
+            hook = defeated_hooks.get(threat.type)
+            if hook is not None:
+                spawned = hook(self, threat)
+                if spawned:
+                    new_threats.extend(spawned)
+
+        if self.stats is not None:
+            self.stats.count('defeated', len(self.game_state.active_threats) - len(survivors))
+            self.stats.count('dropped', len(new_threats))
+
+        if len(survivors) != len(self.game_state.active_threats):
+            # Replace in place so anything holding the list sees the update
+            self.game_state.active_threats[:] = survivors
+
+        self.game_state.active_threats.extend(new_threats)
+        self.game_state.points += points_earned
+        self.game_state.score += points_earned
+
+        return points_earned
+
+    def buy_tool(self, tool_type):
+        tool = self.tools_data[tool_type]
+        cost = int(tool.cost * self.game_state.shop_price_multiplier)
+
+        if self.game_state.points >= cost and tool_type not in self.game_state.owned_tools:
+            self.game_state.points -= cost
+            self.game_state.owned_tools.append(tool_type)
+            return True
+        return False
+
+    def next_turn(self):
+        self.game_state.turn += 1
+        self.game_state.scans_this_turn = 0
+        self.game_state.tools_used_this_turn = 0
+        self.process_threat_specials()
+
+    def fork(self):
+        """Engine over a forked game state that shares the static tables with this one
+
+        The RNG state is copied too, so a fork replays exactly what this engine
+        would do next; reseed fork.rng to branch on chance outcomes instead.
+        """
+        clone = copy.copy(self)
+        clone.game_state = self.game_state.fork()
+        # Lookahead work shouldn't show up in the real game's numbers, or in its action log
+        clone.stats = None
+        clone.recorder = None
+        # copy.copy also copied any wrappers, which are bound to this engine
+        clone.install_wrappers()
+        clone.rng = random.Random()
+        clone.rng.setstate(self.rng.getstate())
+        return clone
+
+    def enable_stats(self):
+        """Start recording per-phase timings and threat counters"""
+        if self.stats is None:
+            self.stats = EngineStats()
+            self.install_wrappers()
+        return self.stats
+
+    def disable_stats(self):
+        self.stats = None
+        self.install_wrappers()
+
+    def install_wrappers(self):
+        """Rebuild the wrappers on this instance to match self.stats and self.recorder
+
+        Timing wrappers go over the ENGINE_PHASES methods while stats are on
+        and recording wrappers over the RECORDED_ACTIONS while a recorder is
+        attached, outermost so the recorder sees the call as the player made
+        it. They live in the instance dict only, so with neither on every
+        method is a plain call with no overhead.
+        """
+        for name in set(ENGINE_PHASES) | set(RECORDED_ACTIONS):
+            self.__dict__.pop(name, None)
+            timed = self.stats is not None and name in ENGINE_PHASES
+            recorded = self.recorder is not None and name in RECORDED_ACTIONS
+            if not (timed or recorded):
+                continue
+            method = getattr(self, name)
+            if timed:
+                method = timed_phase(self.stats, name, method)
+            if recorded:
+                method = recorded_action(self, self.recorder, name, method)
+            setattr(self, name, method)
+
+    def stats_snapshot(self):
+        return self.stats.snapshot() if self.stats is not None else None
+
+    def reset_stats(self):
+        if self.stats is not None:
+            self.stats.reset()
+
+    def export_stats(self, path):
+        self.stats.export(path)
+
+    def new_game(self):
+        self.game_state = GameState()
+        self.game_state.owned_tools = list(STARTING_TOOLS)
@@ -0,0 +1,192 @@
+import json
+import zlib
+
+from engine import Threat, THREAT_NAMES, TOOL_NAMES, threat_code, tool_code
+from save_format import encode_game_state, decode_game_state
+
+
+# A full snapshot is journalled every this many recorded turns; recovery replays at most this many deltas
+JOURNAL_SNAPSHOT_TURNS = 20
+
+# GameState fields a delta carries when they change; the per-turn counters are reset at every turn boundary
+SCALAR_FIELDS = ('server_hp', 'max_server_hp', 'points', 'score', 'turn', 'game_over', 'points_multiplier',
+                 'tool_effectiveness_multiplier', 'shop_price_multiplier', 'botnet_buff')
+
+THREAT_FIELDS = ('type', 'hp', 'max_hp', 'attack', 'special_active', 'turns_alive', 'detection_chance')
+
+
+def threat_row(threat):
+    return (threat.type, threat.hp, threat.max_hp, threat.attack,
+            threat.special_active, threat.turns_alive, threat.detection_chance)
+
+
+class TurnJournal:
+    """Append-only autosave of one game: a snapshot every few turns and a small delta for each turn between
+
+    record() is called once per finished turn. It diffs the live threats
+    against the ones it saw last time by object identity, so threats that
+    were only damaged cost a few numbers and ones that were untouched cost
+    nothing. Anything the diff can't express (a new game, a load, reordered
+    threats) simply gets a snapshot instead. Writes go through the
+    database's background writer.
+
+    Every entry carries the next number in one sequence. A failed write
+    leaves a hole in it even if deltas queued behind it commit, and
+    recover() stops at the first hole rather than apply deltas across it.
+    """
+
+    def __init__(self, db, session, snapshot_every=JOURNAL_SNAPSHOT_TURNS):
+        self.db = db
+        self.session = session
+        self.snapshot_every = snapshot_every
+        self.last_state = None
+        self.last_scalars = None
+        self.last_tools = None
+        self.last_threats = None
+        self.last_rows = None
+        self.turns_since_snapshot = 0
+        self.broken = False
+        self.seq = 0
+
+    def start(self, game_state):
+        """Begin the journal afresh from game_state"""
+        self.last_state = None
+        self.record(game_state)
+
+    def record(self, game_state):
+        delta = None
+        if (not self.broken and game_state is self.last_state
+                and self.turns_since_snapshot < self.snapshot_every):
+            delta = self.diff(game_state)
+
+        self.seq += 1
+        if delta is None:
+            self.broken = False
+            self.turns_since_snapshot = 0
+            self.db.append_journal_async(self.session, game_state.turn, 'snapshot', self.seq,
+                                         encode_game_state(game_state), self.written)
+        else:
+            self.turns_since_snapshot += 1
+            data = zlib.compress(json.dumps(delta, separators=(',', ':')).encode('utf-8'))
+            self.db.append_journal_async(self.session, game_state.turn, 'delta', self.seq, data, self.written)
+
+        self.last_state = game_state
+        self.last_scalars = [getattr(game_state, name) for name in SCALAR_FIELDS]
+        self.last_tools = list(game_state.owned_tools)
+        self.last_threats = list(game_state.active_threats)
+        self.last_rows = [threat_row(threat) for threat in game_state.active_threats]
+
+    def written(self, ok, error):
+        # A lost entry breaks the chain, so the next turn starts a new one
+        if not ok:
+            self.broken = True
+
+    def diff(self, game_state):
+        """Delta from the last recorded turn, or None when only a snapshot will do"""
+        owned_tools = game_state.owned_tools
+        if owned_tools[:len(self.last_tools)] != self.last_tools:
+            return None
+
+        # last_threats holds references, so no id() below can belong to a newer threat
+        current_ids = set(map(id, game_state.active_threats))
+        removed = []
+        survivors = []
+        for index, threat in enumerate(self.last_threats):
+            if id(threat) in current_ids:
+                survivors.append(index)
+            else:
+                removed.append(index)
+
+        # Survivors have to keep their order at the front, with new threats after them
+        threats = game_state.active_threats
+        last_threats = self.last_threats
+        for position, index in enumerate(survivors):
+            if threats[position] is not last_threats[index]:
+                return None
+
+        # Every threat ages each turn; say so once rather than once per threat
+        rows = [threat_row(threats[position]) for position in range(len(survivors))]
+        last_rows = self.last_rows
+        turns_alive = THREAT_FIELDS.index('turns_alive')
+        aged = rows[0][turns_alive] - last_rows[survivors[0]][turns_alive] if survivors else 0
+
+        changed = []
+        for position, index in enumerate(survivors):
+            row = rows[position]
+            last_row = last_rows[index]
+            if row == last_row:
+                continue
+            fields = {}
+            for field, name in enumerate(THREAT_FIELDS):
+                expected = last_row[field] + aged if field == turns_alive else last_row[field]
+                if row[field] != expected:
+                    fields[name] = THREAT_NAMES[row[field]] if name == 'type' else row[field]
+            if fields:
+                changed.append([position, fields])
+
+        delta = {
+            'scalars': {name: getattr(game_state, name) for name, last in zip(SCALAR_FIELDS, self.last_scalars)
+                        if getattr(game_state, name) != last},
+            'tools': [TOOL_NAMES[tool_type] for tool_type in owned_tools[len(self.last_tools):]],
+            'removed': removed,
+            'aged': aged,
+            'changed': changed,
+            'added': [[THREAT_NAMES[threat.type]] + list(threat_row(threat)[1:])
+                      for threat in threats[len(survivors):]],
+        }
+        return delta
+
+    def recover(self):
+        """Latest journalled state, rebuilt from the last snapshot and the unbroken run of deltas after it
+
+        None if the journal is empty.
+        """
+        entries = self.db.read_journal(self.session)
+        if not entries:
+            return None
+
+        # Carry on numbering after whatever is already there, so a snapshot
+        # that fails to write can't leave new deltas that seem to follow an old one
+        self.seq = max(self.seq, max(entry[2] or 0 for entry in entries))
+
+        game_state = decode_game_state(entries[0][3])
+        expected = entries[0][2]
+        for turn, kind, seq, data in entries[1:]:
+            if expected is None or seq != expected + 1:
+                break
+            try:
+                delta = json.loads(zlib.decompress(data))
+            except (zlib.error, ValueError):
+                # A torn entry; nothing after it can follow on either
+                break
+            apply_delta(game_state, delta)
+            expected = seq
+        return game_state
+
+    def clear(self):
+        self.db.clear_journal(self.session)
+        self.last_state = None
+
+
+def apply_delta(game_state, delta):
+    for name, value in delta['scalars'].items():
+        setattr(game_state, name, value)
+    game_state.owned_tools.extend(tool_code(name) for name in delta['tools'])
+
+    removed = set(delta['removed'])
+    threats = [threat for index, threat in enumerate(game_state.active_threats) if index not in removed]
+
+    aged = delta['aged']
+    if aged:
+        for threat in threats:
+            threat.turns_alive += aged
+
+    for position, fields in delta['changed']:
+        threat = threats[position]
+        for name, value in fields.items():
+            setattr(threat, name, threat_code(value) if name == 'type' else value)
+
+    for row in delta['added']:
+        threats.append(Threat(threat_code(row[0]), *row[1:]))
+
+    game_state.active_threats = threats
@@ -0,0 +1,120 @@
+import collections
+import contextlib
+import functools
+import json
+import threading
+import time
+
+from simulate import percentile
+
+
+# Samples kept per measurement; older ones are dropped
+MAX_SAMPLES = 5000
+
+HEARTBEAT_MS = 100
+
+
+class LatencyMonitor:
+    """Records how long GUI callbacks, engine calls, database calls and redraws take
+
+    Methods are wrapped on the instance, so nothing is timed (and nothing
+    costs anything) unless a monitor was attached. Time spent inside paused()
+    (a modal dialog waiting on the player, say) is left out of every timing
+    it falls in. A heartbeat scheduled with root.after measures how late the
+    Tk main loop gets round to it, which is the freeze a player actually sees.
+    Timings may be recorded from other threads, such as the database writer.
+    """
+
+    def __init__(self):
+        self.samples = collections.defaultdict(lambda: collections.deque(maxlen=MAX_SAMPLES))
+        self.samples_lock = threading.Lock()
+        self.heartbeat_root = None
+        self.heartbeat_due = None
+        # Total time spent paused so far; a timing subtracts whatever this grew by while it ran
+        self.paused_seconds = 0.0
+
+    def record(self, name, seconds):
+        with self.samples_lock:
+            self.samples[name].append(seconds)
+
+    def wrap(self, obj, method_names, prefix=''):
+        """Replace obj.<name> with a timed version for each name, recorded as prefix + name"""
+        for method_name in method_names:
+            method = getattr(obj, method_name)
+            setattr(obj, method_name, self.timed(prefix + method_name, method))
+
+    def timed(self, name, func, pausable=True):
+        """func timed as name; pass pausable=False for code off the Tk thread, which dialogs don't hold up"""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            paused = self.paused_seconds
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                if pausable:
+                    elapsed -= self.paused_seconds - paused
+                self.record(name, elapsed)
+        return wrapper
+
+    @contextlib.contextmanager
+    def measure(self, name):
+        start = time.perf_counter()
+        paused = self.paused_seconds
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start - (self.paused_seconds - paused))
+
+    @contextlib.contextmanager
+    def paused(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.paused_seconds += time.perf_counter() - start
+
+    def start_heartbeat(self, root):
+        self.heartbeat_root = root
+        self.heartbeat_due = time.perf_counter() + HEARTBEAT_MS / 1000
+        root.after(HEARTBEAT_MS, self.heartbeat)
+
+    def heartbeat(self):
+        now = time.perf_counter()
+        self.record('mainloop.lag', max(0.0, now - self.heartbeat_due))
+        self.heartbeat_due = now + HEARTBEAT_MS / 1000
+        self.heartbeat_root.after(HEARTBEAT_MS, self.heartbeat)
+
+    def snapshot(self):
+        """Per-measurement count and p50/p90/p99/max in milliseconds"""
+        stats = {}
+        with self.samples_lock:
+            samples_by_name = {name: list(samples) for name, samples in self.samples.items()}
+        for name, samples in sorted(samples_by_name.items()):
+            if not samples:
+                continue
+            values = sorted(samples)
+            stats[name] = {
+                'count': len(values),
+                'p50_ms': percentile(values, 0.5) * 1000,
+                'p90_ms': percentile(values, 0.9) * 1000,
+                'p99_ms': percentile(values, 0.99) * 1000,
+                'max_ms': values[-1] * 1000,
+            }
+        return stats
+
+    def report(self):
+        lines = ["name".ljust(34) + "count".rjust(7) + "p50".rjust(9) + "p90".rjust(9) + "p99".rjust(9) + "max".rjust(9)]
+        for name, stats in self.snapshot().items():
+            lines.append(name.ljust(34) + str(stats['count']).rjust(7) +
+                         "".join(str(round(stats[key], 1)).rjust(9) for key in ('p50_ms', 'p90_ms', 'p99_ms', 'max_ms')))
+        return "\n".join(lines)
+
+    def dump(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+    def reset(self):
+        with self.samples_lock:
+            self.samples.clear()
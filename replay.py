@@ -0,0 +1,239 @@
+import argparse
+import json
+import random
+import time
+import zlib
+
+from engine import GameEngine
+
+
+# Version 2 added keyword arguments as a fourth entry field; version 1 logs replay unchanged
+ACTION_LOG_VERSION = 2
+
+# Replay keeps an in-memory fork every this many turns, so seek() never re-runs more than this many
+SNAPSHOT_TURNS = 25
+
+
+class RecordingRandom(random.Random):
+    """Random that notes every primitive draw, so draws made outside engine actions can be replayed
+
+    Every Random method bottoms out in random() or getrandbits(k); because
+    both are overridden, _randbelow still takes the getrandbits path and the
+    stream is identical to a plain Random with the same state.
+    """
+
+    def __init__(self, state):
+        super().__init__()
+        self.setstate(state)
+        self.draws = []
+
+    def random(self):
+        self.draws.append(0)
+        return super().random()
+
+    def getrandbits(self, k):
+        self.draws.append(k)
+        return super().getrandbits(k)
+
+
+def replay_draws(rng, draws):
+    for k in draws:
+        if k:
+            rng.getrandbits(k)
+        else:
+            rng.random()
+
+
+def state_checksum(game_state):
+    """CRC of every saved field of the state, the same on every machine and Python run"""
+    threats = [(threat.type, threat.hp, threat.max_hp, threat.attack, threat.special_active,
+                threat.turns_alive, threat.detection_chance) for threat in game_state.active_threats]
+    fields = (game_state.server_hp, game_state.max_server_hp, game_state.points, game_state.score,
+              game_state.turn, game_state.game_over, game_state.points_multiplier,
+              game_state.tool_effectiveness_multiplier, game_state.shop_price_multiplier,
+              game_state.botnet_buff, game_state.owned_tools, threats)
+    return zlib.crc32(repr(fields).encode('ascii'))
+
+
+class ActionRecorder:
+    """Records a seeded engine as its seed plus the actions played on it
+
+    Attach straight after creating the engine. Each action is stored as
+    [name, args] with use_tool's threat as its index in active_threats;
+    if anything outside the engine (a random policy, say) drew from
+    engine.rng since the last action, the draws are appended so the replay
+    can make them too, and keyword arguments follow the draws. A checksum of the state is kept after every
+    next_turn and new_game.
+    """
+
+    def __init__(self, engine):
+        if engine.seed is None:
+            raise ValueError("Only a seeded engine can be recorded")
+        self.seed = engine.seed
+        self.actions = []
+        self.checksums = [[0, engine.game_state.turn, state_checksum(engine.game_state)]]
+        engine.rng = RecordingRandom(engine.rng.getstate())
+        engine.recorder = self
+        engine.install_wrappers()
+
+    def before(self, engine, action, args, kwargs):
+        if action == 'use_tool':
+            # use_tool is always logged positionally, so the threat can be swapped for its index
+            arguments = dict(zip(('tool_type', 'target_threat'), args))
+            arguments.update(kwargs)
+            tool_type, target_threat = arguments['tool_type'], arguments['target_threat']
+            kwargs = {}
+            try:
+                args = (tool_type, engine.game_state.active_threats.index(target_threat))
+            except ValueError:
+                # A threat already gone from the board; using a tool on it changes nothing
+                args = (tool_type, None)
+
+        entry = [action, list(args)]
+        draws = engine.rng.draws
+        if draws or kwargs:
+            entry.append(list(draws))
+            draws.clear()
+        if kwargs:
+            entry.append(dict(kwargs))
+        self.actions.append(entry)
+
+    def after(self, engine, action):
+        engine.rng.draws.clear()
+        if action in ('next_turn', 'new_game'):
+            self.checksums.append([len(self.actions), engine.game_state.turn, state_checksum(engine.game_state)])
+
+    def detach(self, engine):
+        engine.recorder = None
+        engine.install_wrappers()
+        rng = random.Random()
+        rng.setstate(engine.rng.getstate())
+        engine.rng = rng
+
+    def to_dict(self):
+        return {'version': ACTION_LOG_VERSION, 'seed': self.seed, 'actions': self.actions,
+                'checksums': self.checksums}
+
+
+class Replay:
+    """Re-runs an action log headlessly, checking every recorded checksum on the way
+
+    Forks taken every SNAPSHOT_TURNS turns during replay let seek() jump to
+    any turn by replaying only from the nearest one before it.
+    """
+
+    def __init__(self, log):
+        if log.get('version') not in (1, ACTION_LOG_VERSION):
+            raise ValueError("Unsupported action log version: " + str(log.get('version')))
+        self.seed = log['seed']
+        self.actions = log['actions']
+        self.checksums = {index: (turn, checksum) for index, turn, checksum in log['checksums']}
+        # (action index, engine fork), in action order
+        self.snapshots = [(0, GameEngine(self.seed))]
+        self.verify_checksum(0, self.snapshots[0][1])
+
+    def verify_checksum(self, index, engine):
+        expected = self.checksums.get(index)
+        if expected is not None and state_checksum(engine.game_state) != expected[1]:
+            raise ValueError("Replay diverged from the recording at turn " + str(expected[0]) +
+                             " (action " + str(index) + ")")
+
+    def apply(self, engine, entry):
+        action, args = entry[0], entry[1]
+        if len(entry) > 2:
+            replay_draws(engine.rng, entry[2])
+        kwargs = entry[3] if len(entry) > 3 else {}
+
+        if action == 'use_tool':
+            tool_type, index = args
+            if index is not None:
+                engine.use_tool(tool_type, engine.game_state.active_threats[index])
+        else:
+            getattr(engine, action)(*args, **kwargs)
+
+    def play(self, engine, start, stop, verify=True):
+        """Apply actions[start:stop] to engine, snapshotting and verifying as it goes"""
+        last_snapshot_turn = engine.game_state.turn
+        for index in range(start, stop):
+            entry = self.actions[index]
+            self.apply(engine, entry)
+            if verify:
+                self.verify_checksum(index + 1, engine)
+            if entry[0] == 'next_turn' and engine.game_state.turn - last_snapshot_turn >= SNAPSHOT_TURNS:
+                last_snapshot_turn = engine.game_state.turn
+                if index + 1 > self.snapshots[-1][0]:
+                    self.snapshots.append((index + 1, engine.fork()))
+        return engine
+
+    def run(self, verify=True):
+        """Engine at the end of the recording"""
+        index, engine = self.snapshots[-1]
+        return self.play(engine.fork(), index, len(self.actions), verify)
+
+    def seek(self, turn, verify=True):
+        """Engine at the start of turn, i.e. just after the next_turn that began it"""
+        stop = len(self.actions)
+        for index, (checksum_turn, _) in sorted(self.checksums.items()):
+            if checksum_turn >= turn:
+                stop = index
+                break
+
+        start, engine = 0, None
+        for index, snapshot in self.snapshots:
+            if index > stop:
+                break
+            start, engine = index, snapshot
+        return self.play(engine.fork(), start, stop, verify)
+
+
+def read_logs(path):
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Action log replay")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    verify_parser = subparsers.add_parser('verify', help="replay every log in a JSONL file and check its checksums")
+    verify_parser.add_argument('path')
+
+    show_parser = subparsers.add_parser('show', help="print the state of one game at a given turn")
+    show_parser.add_argument('path')
+    show_parser.add_argument('--game', type=int, default=0, help="line number of the log, from 0")
+    show_parser.add_argument('--turn', type=int, default=None, help="default: the end of the game")
+    args = parser.parse_args()
+
+    if args.command == 'verify':
+        games = 0
+        failures = 0
+        start = time.perf_counter()
+        for game_index, log in enumerate(read_logs(args.path)):
+            games += 1
+            try:
+                Replay(log).run()
+            except (ValueError, IndexError, KeyError) as error:
+                failures += 1
+                print("Game " + str(game_index) + " (seed " + str(log.get('seed')) + "): " + str(error))
+        elapsed = time.perf_counter() - start
+        print("Replayed " + str(games) + " games, " + str(failures) + " diverged (" +
+              str(round(games / elapsed if elapsed else 0.0)) + " games/s)")
+        return
+
+    for game_index, log in enumerate(read_logs(args.path)):
+        if game_index == args.game:
+            replay = Replay(log)
+            engine = replay.run() if args.turn is None else replay.seek(args.turn)
+            game_state = engine.game_state
+            print("Seed: " + str(log['seed']) + " | Turn: " + str(game_state.turn) + " | HP: " +
+                  str(game_state.server_hp) + "/" + str(game_state.max_server_hp) + " | Points: " +
+                  str(game_state.points) + " | Score: " + str(game_state.score) + " | Threats: " +
+                  str(len(game_state.active_threats)) + " | Game over: " + str(game_state.game_over))
+            return
+    print("No game " + str(args.game) + " in " + args.path)
+
+
+if __name__ == "__main__":
+    main()
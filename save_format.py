@@ -0,0 +1,378 @@
+import argparse
+import hashlib
+import json
+import struct
+import zlib
+
+from engine import Threat, GameState, THREAT_NAMES, TOOL_NAMES, threat_code, tool_code
+
+
+# Binary saves start with these bytes, then one version byte, then the zlib-compressed payload
+SAVE_MAGIC = b'CDGS'
+SAVE_FORMAT_VERSION = 1
+
+# zlib's default; level 1 writes about twice as fast but the saves come out over half as large again
+ZLIB_LEVEL = 6
+
+# server_hp, max_server_hp, points, score, turn, botnet_buff, game_over,
+# points / tool effectiveness / shop price multipliers, threat, tool and threat-type counts
+HEADER = struct.Struct('<qqqqqq?dddIHH')
+
+# Threat type (index into the save's own type-name table), hp, max_hp, attack,
+# special_active, turns_alive, detection_chance
+THREAT_ROW = struct.Struct('<Hqqq?Id')
+
+NAME_LENGTH = struct.Struct('<B')
+
+# Chunked saves: the save row holds only these bytes, a version byte and the chunk hashes,
+# in order scalars (HEADER), owned tools, then the threat chunks (in version 3, one state
+# chunk for every threat and then a spawn chunk for each run of threats)
+MANIFEST_MAGIC = b'CDGM'
+MANIFEST_VERSION = 3
+CHUNK_HASH_SIZE = 32
+
+# Version 1 manifests cut threats into fixed blocks of this many THREAT_ROWs
+THREAT_CHUNK_ROWS = 512
+
+# Threats are stored as what they were born with, which never changes, and their hp, attack and
+# special_active, which do. Spawn rows hold the turn a threat spawned rather than turns_alive, so
+# a whole spawn chunk stays the same turn after turn. Version 2 kept a state chunk beside each
+# spawn chunk; state changes every turn and so was never shared, and version 3 packs it all into one.
+# Spawn rows: type index, max_hp, spawn turn, detection_chance. State rows: hp, attack, special_active
+SPAWN_ROW = struct.Struct('<Hqqd')
+STATE_ROW = struct.Struct('<qq?')
+
+# Spawn runs are cut after any threat where the CRCs of the spawn rows of it and the few before
+# it sum to a multiple of THREAT_CHUNK_AVERAGE, so the cuts follow the threats themselves: adding or
+# removing one only rewrites the run around it instead of shifting every block after it. Many
+# threats spawn alike, hence the window; the bounds keep runs from getting very short or long.
+THREAT_CHUNK_AVERAGE = 128
+THREAT_CHUNK_MIN = 32
+THREAT_CHUNK_MAX = 512
+THREAT_CHUNK_WINDOW = 4
+
+TYPE_COUNT = struct.Struct('<H')
+
+
+def encode_game_state(game_state):
+    """Compact binary save for game_state, or JSON text if a value doesn't fit the packed layout"""
+    try:
+        return encode_binary(game_state)
+    except (struct.error, TypeError, ValueError):
+        return encode_json(game_state)
+
+
+def decode_game_state(data):
+    """GameState from either save format; JSON saves are anything that isn't binary"""
+    if is_binary(data):
+        return decode_binary(data)
+    if isinstance(data, bytes):
+        data = data.decode('utf-8')
+    return decode_json(data)
+
+
+def is_binary(data):
+    return isinstance(data, bytes) and data[:len(SAVE_MAGIC)] == SAVE_MAGIC
+
+
+def encode_binary(game_state):
+    threats = game_state.active_threats
+
+    # Types are stored by name, once per save, so renumbering the enum can't break old saves
+    type_indexes = {}
+    for threat in threats:
+        if threat.type not in type_indexes:
+            type_indexes[threat.type] = len(type_indexes)
+
+    parts = [HEADER.pack(
+        game_state.server_hp, game_state.max_server_hp, game_state.points, game_state.score,
+        game_state.turn, game_state.botnet_buff, game_state.game_over,
+        game_state.points_multiplier, game_state.tool_effectiveness_multiplier, game_state.shop_price_multiplier,
+        len(threats), len(game_state.owned_tools), len(type_indexes)
+    )]
+    parts.extend(pack_names(TOOL_NAMES[tool_type] for tool_type in game_state.owned_tools))
+    parts.extend(pack_names(THREAT_NAMES[threat_type] for threat_type in type_indexes))
+
+    pack_row = THREAT_ROW.pack
+    parts.extend(pack_row(type_indexes[threat.type], threat.hp, threat.max_hp, threat.attack,
+                          threat.special_active, threat.turns_alive, threat.detection_chance)
+                 for threat in threats)
+
+    return SAVE_MAGIC + bytes([SAVE_FORMAT_VERSION]) + zlib.compress(b''.join(parts), ZLIB_LEVEL)
+
+
+def pack_names(names):
+    for name in names:
+        encoded = name.encode('utf-8')
+        yield NAME_LENGTH.pack(len(encoded))
+        yield encoded
+
+
+def read_names(payload, offset, count):
+    names = []
+    for _ in range(count):
+        length = payload[offset]
+        offset += NAME_LENGTH.size
+        names.append(bytes(payload[offset:offset + length]).decode('utf-8'))
+        offset += length
+    return names, offset
+
+
+def decode_binary(data):
+    version = data[len(SAVE_MAGIC)]
+    if version != SAVE_FORMAT_VERSION:
+        raise ValueError("Unsupported save format version: " + str(version))
+
+    payload = memoryview(zlib.decompress(data[len(SAVE_MAGIC) + 1:]))
+    game_state, threat_count, tool_count, type_count = unpack_header(payload)
+
+    tool_names, offset = read_names(payload, HEADER.size, tool_count)
+    type_names, offset = read_names(payload, offset, type_count)
+    game_state.owned_tools = [tool_code(name) for name in tool_names]
+    game_state.active_threats = unpack_threats(payload, offset, threat_count, type_names)
+    return game_state
+
+
+def unpack_header(payload):
+    """GameState holding the HEADER scalars, plus the threat, tool and threat-type counts"""
+    (server_hp, max_server_hp, points, score, turn, botnet_buff, game_over,
+     points_multiplier, tool_effectiveness_multiplier, shop_price_multiplier,
+     threat_count, tool_count, type_count) = HEADER.unpack_from(payload)
+
+    game_state = GameState()
+    game_state.server_hp = server_hp
+    game_state.max_server_hp = max_server_hp
+    game_state.points = points
+    game_state.score = score
+    game_state.turn = turn
+    game_state.botnet_buff = botnet_buff
+    game_state.game_over = game_over
+    game_state.points_multiplier = points_multiplier
+    game_state.tool_effectiveness_multiplier = tool_effectiveness_multiplier
+    game_state.shop_price_multiplier = shop_price_multiplier
+    return game_state, threat_count, tool_count, type_count
+
+
+def unpack_threats(payload, offset, count, type_names):
+    # Rows unpack straight into Threat arguments, with the type index swapped for its code
+    codes = [threat_code(name) for name in type_names]
+    rows = payload[offset:offset + count * THREAT_ROW.size]
+    return [
+        Threat(codes[type_index], hp, max_hp, attack, special_active, turns_alive, detection_chance)
+        for type_index, hp, max_hp, attack, special_active, turns_alive, detection_chance
+        in THREAT_ROW.iter_unpack(rows)
+    ]
+
+
+def is_manifest(data):
+    return isinstance(data, bytes) and data[:len(MANIFEST_MAGIC)] == MANIFEST_MAGIC
+
+
+def encode_manifest(game_state):
+    """Split a save into content-addressed chunks; returns (manifest, {hash: stored chunk})
+
+    Identical scalars, tool sets and threat chunks hash the same, so a
+    database storing chunks by hash keeps each of them once however many
+    saves share them. Successive saves of one game share most of their
+    spawn chunks. Raises struct.error for states the packed layout can't hold.
+    """
+    threats = game_state.active_threats
+    owned_tools = game_state.owned_tools
+    raw_chunks = [
+        HEADER.pack(
+            game_state.server_hp, game_state.max_server_hp, game_state.points, game_state.score,
+            game_state.turn, game_state.botnet_buff, game_state.game_over,
+            game_state.points_multiplier, game_state.tool_effectiveness_multiplier, game_state.shop_price_multiplier,
+            len(threats), len(owned_tools), 0
+        ),
+        b''.join(pack_names(TOOL_NAMES[tool_type] for tool_type in owned_tools)),
+    ]
+    pack_state = STATE_ROW.pack
+    raw_chunks.append(b''.join(pack_state(threat.hp, threat.attack, threat.special_active) for threat in threats))
+    turn = game_state.turn
+    raw_chunks.extend(pack_spawn_chunk(run, turn) for run in split_threats(threats, turn))
+
+    hashes = []
+    chunks = {}
+    for raw in raw_chunks:
+        digest = hashlib.sha256(raw).digest()
+        hashes.append(digest)
+        chunks[digest] = zlib.compress(raw, ZLIB_LEVEL)
+    return MANIFEST_MAGIC + bytes([MANIFEST_VERSION]) + b''.join(hashes), chunks
+
+
+def split_threats(threats, turn):
+    """Threats cut into runs at content-defined boundaries"""
+    runs = []
+    start = 0
+    pack_row = SPAWN_ROW.pack
+    # Only fields that never change after a threat spawns decide a cut, so damage or growth
+    # can't move one; the type code stands in for the per-chunk index, which isn't known yet
+    crcs = list(map(zlib.crc32, [pack_row(threat.type, threat.max_hp, turn - threat.turns_alive,
+                                          threat.detection_chance) for threat in threats]))
+    windows = map(sum, zip(*([0] * shift + crcs for shift in range(THREAT_CHUNK_WINDOW))))
+    cuts = [index + 1 for index, window in enumerate(windows) if window % THREAT_CHUNK_AVERAGE == 0]
+    cuts.append(len(threats))
+
+    for end in cuts:
+        while end - start > THREAT_CHUNK_MAX:
+            runs.append(threats[start:start + THREAT_CHUNK_MAX])
+            start += THREAT_CHUNK_MAX
+        # The last run ends with the threats, however short it is
+        if end - start >= THREAT_CHUNK_MIN or (end == len(threats) and end > start):
+            runs.append(threats[start:end])
+            start = end
+    return runs
+
+
+def pack_spawn_chunk(threats, turn):
+    """Spawn chunk for one run of threats"""
+    # Each spawn chunk carries its own type-name table, so it means the same thing in every save that uses it
+    type_indexes = {}
+    for threat in threats:
+        if threat.type not in type_indexes:
+            type_indexes[threat.type] = len(type_indexes)
+
+    spawn_parts = [TYPE_COUNT.pack(len(type_indexes))]
+    spawn_parts.extend(pack_names(THREAT_NAMES[threat_type] for threat_type in type_indexes))
+    pack_spawn = SPAWN_ROW.pack
+    spawn_parts.extend(pack_spawn(type_indexes[threat.type], threat.max_hp, turn - threat.turns_alive,
+                                  threat.detection_chance)
+                       for threat in threats)
+    return b''.join(spawn_parts)
+
+
+def manifest_hashes(manifest):
+    body = manifest[len(MANIFEST_MAGIC) + 1:]
+    return [body[i:i + CHUNK_HASH_SIZE] for i in range(0, len(body), CHUNK_HASH_SIZE)]
+
+
+def decode_manifest(manifest, chunks):
+    """GameState from a manifest and a {hash: stored chunk} mapping holding every chunk it lists"""
+    version = manifest[len(MANIFEST_MAGIC)]
+    if version not in (1, 2, MANIFEST_VERSION):
+        raise ValueError("Unsupported save manifest version: " + str(version))
+
+    hashes = manifest_hashes(manifest)
+    game_state, threat_count, tool_count, _ = unpack_header(zlib.decompress(chunks[hashes[0]]))
+    game_state.owned_tools = [tool_code(name) for name in read_names(zlib.decompress(chunks[hashes[1]]), 0,
+                                                                     tool_count)[0]]
+
+    threats = []
+    if version == 1:
+        for digest in hashes[2:]:
+            payload = memoryview(zlib.decompress(chunks[digest]))
+            type_names, offset = read_names(payload, TYPE_COUNT.size, TYPE_COUNT.unpack_from(payload)[0])
+            count = min(THREAT_CHUNK_ROWS, threat_count - len(threats))
+            threats.extend(unpack_threats(payload, offset, count, type_names))
+    elif version == 2:
+        for index in range(2, len(hashes), 2):
+            state = STATE_ROW.iter_unpack(zlib.decompress(chunks[hashes[index + 1]]))
+            threats.extend(unpack_spawn_chunk(zlib.decompress(chunks[hashes[index]]), state, game_state.turn))
+    else:
+        state = STATE_ROW.iter_unpack(zlib.decompress(chunks[hashes[2]]))
+        for digest in hashes[3:]:
+            threats.extend(unpack_spawn_chunk(zlib.decompress(chunks[digest]), state, game_state.turn))
+    game_state.active_threats = threats
+    return game_state
+
+
+def unpack_spawn_chunk(spawn, state, turn):
+    # Spawn rows run to the end of the chunk; each takes the next row from the state iterator
+    spawn = memoryview(spawn)
+    type_names, offset = read_names(spawn, TYPE_COUNT.size, TYPE_COUNT.unpack_from(spawn)[0])
+    codes = [threat_code(name) for name in type_names]
+    return [
+        Threat(codes[type_index], hp, max_hp, attack, special_active, turn - spawn_turn, detection_chance)
+        for (type_index, max_hp, spawn_turn, detection_chance), (hp, attack, special_active)
+        in zip(SPAWN_ROW.iter_unpack(spawn[offset:]), state)
+    ]
+
+
+def threat_to_dict(threat):
+    return {
+        'type': THREAT_NAMES[threat.type],
+        'hp': threat.hp,
+        'max_hp': threat.max_hp,
+        'attack': threat.attack,
+        'special_active': threat.special_active,
+        'turns_alive': threat.turns_alive,
+        'detection_chance': threat.detection_chance
+    }
+
+
+def encode_json(game_state):
+    """The original save format, still written for states the binary layout can't hold"""
+    game_data = {
+        'server_hp': game_state.server_hp,
+        'max_server_hp': game_state.max_server_hp,
+        'points': game_state.points,
+        'score': game_state.score,
+        'turn': game_state.turn,
+        'active_threats': [threat_to_dict(threat) for threat in game_state.active_threats],
+        'owned_tools': [TOOL_NAMES[tool_type] for tool_type in game_state.owned_tools],
+        'game_over': game_state.game_over,
+        'points_multiplier': game_state.points_multiplier,
+        'tool_effectiveness_multiplier': game_state.tool_effectiveness_multiplier,
+        'shop_price_multiplier': game_state.shop_price_multiplier,
+        'botnet_buff': game_state.botnet_buff
+    }
+    return json.dumps(game_data)
+
+
+def decode_json(text):
+    game_data = json.loads(text)
+    game_state = GameState()
+    game_state.server_hp = game_data['server_hp']
+    game_state.max_server_hp = game_data['max_server_hp']
+    game_state.points = game_data['points']
+    game_state.score = game_data['score']
+    game_state.turn = game_data['turn']
+    game_state.game_over = game_data['game_over']
+    game_state.points_multiplier = game_data.get('points_multiplier', 1.0)
+    game_state.tool_effectiveness_multiplier = game_data.get('tool_effectiveness_multiplier', 1.0)
+    game_state.shop_price_multiplier = game_data.get('shop_price_multiplier', 1.0)
+    game_state.botnet_buff = game_data.get('botnet_buff', 0)
+
+    # Reconstruct threats
+    for threat_data in game_data['active_threats']:
+        threat = Threat(
+            threat_code(threat_data['type']),
+            threat_data['hp'],
+            threat_data['max_hp'],
+            threat_data['attack'],
+            threat_data.get('special_active', False),
+            threat_data.get('turns_alive', 0),
+            threat_data.get('detection_chance', 1.0)
+        )
+        game_state.active_threats.append(threat)
+
+    # Reconstruct owned tools
+    game_state.owned_tools = [tool_code(tool_type) for tool_type in game_data['owned_tools']]
+
+    return game_state
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Save format tools")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    migrate_parser = subparsers.add_parser('migrate', help="rewrite JSON and single-blob saves as chunked saves")
+    migrate_parser.add_argument('db_path')
+    gc_parser = subparsers.add_parser('gc', help="delete save chunks that no save refers to")
+    gc_parser.add_argument('db_path')
+    gc_parser.add_argument('--vacuum', action='store_true', help="then shrink the database file")
+    args = parser.parse_args()
+
+    from database import DatabaseManager
+    db = DatabaseManager(args.db_path)
+    if args.command == 'migrate':
+        migrated = db.migrate_save_format()
+        print("Migrated " + str(migrated) + " saves in " + args.db_path)
+    else:
+        removed = db.collect_garbage(args.vacuum)
+        print("Removed " + str(removed) + " unreferenced chunks from " + args.db_path)
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
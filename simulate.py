@@ -0,0 +1,218 @@
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+
+from engine import GameEngine, EngineStats, THREAT_NAMES, TOOL_NAMES
+from replay import ActionRecorder
+
+
+def random_policy(engine):
+    """Attack a random threat with a random owned tool"""
+    game_state = engine.game_state
+    if not game_state.active_threats or not game_state.owned_tools:
+        return None
+    return engine.rng.choice(game_state.owned_tools), engine.rng.choice(game_state.active_threats)
+
+
+def greedy_policy(engine):
+    """Buy the cheapest affordable tool, then hit the strongest threat with the best tool"""
+    game_state = engine.game_state
+
+    affordable = []
+    for tool_type, tool in engine.tools_data.items():
+        if tool_type not in game_state.owned_tools:
+            cost = int(tool.cost * game_state.shop_price_multiplier)
+            if cost <= game_state.points:
+                affordable.append((cost, tool_type))
+    if affordable:
+        engine.buy_tool(min(affordable)[1])
+
+    if not game_state.active_threats or not game_state.owned_tools:
+        return None
+
+    target_threat = max(game_state.active_threats, key=lambda threat: threat.attack)
+    return engine.best_tool_for(target_threat.type), target_threat
+
+
+POLICIES = {
+    'random': random_policy,
+    'greedy': greedy_policy,
+}
+
+
+def game_seed(base_seed, game_index):
+    # String seeds hash the whole value, so neighbouring games get unrelated streams
+    return str(base_seed) + ":" + str(game_index)
+
+
+def play_turn(engine, policy, scans_per_turn=1, attacks_per_turn=1, log=None):
+    """Play one full turn: scan, use_tool, process_defeated_threats, process_threat_attacks, next_turn
+
+    log, if given, is called with a line of text for each thing that happens.
+    """
+    game_state = engine.game_state
+
+    for _ in range(scans_per_turn):
+        result = engine.scan()
+        if log is not None and "detected" in result:
+            log("Turn " + str(game_state.turn) + ": scan found " + str(len(result["detected"])) + " threats")
+
+    for _ in range(attacks_per_turn):
+        choice = policy(engine)
+        if choice is None:
+            break
+        tool_type, target_threat = choice
+        result = engine.use_tool(tool_type, target_threat)
+        points_earned = engine.process_defeated_threats()
+        if log is not None and "damage" in result:
+            message = "Used " + TOOL_NAMES[tool_type] + " on " + THREAT_NAMES[target_threat.type]
+            message += " for " + str(result["damage"]) + " damage"
+            if result["threat_defeated"]:
+                message += ", threat defeated (+" + str(points_earned) + " points)"
+            log(message)
+
+    engine.process_threat_attacks()
+    if game_state.game_over:
+        if log is not None:
+            log("Server down on turn " + str(game_state.turn) + ". Final score: " + str(game_state.score))
+        return
+    engine.next_turn()
+    if log is not None:
+        log("Turn " + str(game_state.turn) + " begins (server HP " + str(game_state.server_hp) + ")")
+
+
+def play_game(policy, seed, max_turns=200, scans_per_turn=1, attacks_per_turn=1, collect_stats=False,
+              record=False):
+    """Play one complete game headlessly and return its final numbers
+
+    With record, the result also carries the game's action log under 'log'.
+    """
+    engine = GameEngine(seed)
+    game_state = engine.game_state
+    if collect_stats:
+        engine.enable_stats()
+    recorder = ActionRecorder(engine) if record else None
+
+    while not game_state.game_over and game_state.turn <= max_turns:
+        play_turn(engine, policy, scans_per_turn, attacks_per_turn)
+
+    result = {
+        'seed': seed,
+        'turns': game_state.turn,
+        'score': game_state.score,
+        'server_hp': game_state.server_hp,
+    }
+    if collect_stats:
+        result['stats'] = engine.stats_snapshot()
+    if record:
+        result['log'] = recorder.to_dict()
+    return result
+
+
+def _play_indexed(args):
+    policy_name, base_seed, game_index, max_turns, scans_per_turn, attacks_per_turn, collect_stats, record = args
+    return play_game(POLICIES[policy_name], game_seed(base_seed, game_index),
+                     max_turns, scans_per_turn, attacks_per_turn, collect_stats, record)
+
+
+def run_batch(games, policy_name='greedy', base_seed=0, workers=None, max_turns=200,
+              scans_per_turn=1, attacks_per_turn=1, collect_stats=False, record=False):
+    """Play games across a process pool; results come back in game order
+
+    Every game is seeded from (base_seed, game index) rather than from the worker
+    that happens to run it, so any run, or any single game, can be reproduced
+    exactly with a different worker count.
+    """
+    if policy_name not in POLICIES:
+        raise ValueError("Unknown policy: " + policy_name)
+
+    jobs = [(policy_name, base_seed, i, max_turns, scans_per_turn, attacks_per_turn, collect_stats, record)
+            for i in range(games)]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        return [_play_indexed(job) for job in jobs]
+
+    chunksize = max(1, games // (workers * 8))
+    with multiprocessing.Pool(workers) as pool:
+        return pool.map(_play_indexed, jobs, chunksize)
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def merge_stats(results):
+    """Add up the per-game engine stats of a batch run with collect_stats"""
+    stats = EngineStats()
+    for result in results:
+        stats.merge(result['stats'])
+    return stats
+
+
+def summarise(results):
+    """Distribution of survival turns, score and server HP over a batch"""
+    summary = {}
+    for key in ('turns', 'score', 'server_hp'):
+        values = sorted(result[key] for result in results)
+        if not values:
+            continue
+        summary[key] = {
+            'mean': statistics.fmean(values),
+            'stdev': statistics.pstdev(values),
+            'min': values[0],
+            'p10': percentile(values, 0.1),
+            'p50': percentile(values, 0.5),
+            'p90': percentile(values, 0.9),
+            'max': values[-1],
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo balance runner")
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='greedy')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--max-turns', type=int, default=200)
+    parser.add_argument('--scans-per-turn', type=int, default=1)
+    parser.add_argument('--attacks-per-turn', type=int, default=1)
+    parser.add_argument('--stats', metavar='PATH', help="write merged per-phase engine stats as JSON")
+    parser.add_argument('--record', metavar='PATH', help="write every game's action log as JSON lines, for replay.py")
+    parser.add_argument('--db', metavar='PATH', help="record every game as a high score in this database")
+    parser.add_argument('--player', default=None, help="player name for --db rows (default: sim-<policy>)")
+    args = parser.parse_args()
+
+    results = run_batch(args.games, args.policy, args.seed, args.workers, args.max_turns,
+                        args.scans_per_turn, args.attacks_per_turn, args.stats is not None, args.record is not None)
+
+    print("Games: " + str(len(results)) + " | Policy: " + args.policy + " | Seed: " + str(args.seed))
+    for key, stats in summarise(results).items():
+        print(key.ljust(10) + " ".join(name + "=" + str(round(value, 2)) for name, value in stats.items()))
+
+    if args.stats:
+        merge_stats(results).export(args.stats)
+        print("Engine stats written to " + args.stats)
+
+    if args.record:
+        with open(args.record, 'w') as f:
+            for result in results:
+                f.write(json.dumps(result['log'], separators=(',', ':')) + "\n")
+        print("Action logs written to " + args.record)
+
+    if args.db:
+        from database import DatabaseManager
+        player_name = args.player or "sim-" + args.policy
+        db = DatabaseManager(args.db)
+        ingest = db.ingest_high_scores((player_name, result['score'], result['turns']) for result in results)
+        db.close()
+        print("Recorded " + str(ingest['rows']) + " high scores in " + args.db +
+              " (" + str(round(ingest['rows_per_s'])) + " rows/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,18 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
-import sqlite3
-import json
-import random
 import math
+import difflib
+import contextlib
+import getpass
+import queue
+import sys
+import threading
+
+from engine import GameEngine, THREAT_NAMES, TOOL_NAMES
+from database import DatabaseManager
+from simulate import POLICIES, play_turn
+from latency import LatencyMonitor
+from journal import TurnJournal
 
 
 # COLOUR palette
@@ -21,577 +30,245 @@ COLOUR_BUTTON_NEXT_TURN = "#006600"
 COLOUR_BUTTON_SAVE = "#660066"
 COLOUR_BUTTON_LOAD = "#666600"
 COLOUR_BUTTON_HS = "#CC0066"
+COLOUR_BUTTON_TURBO = "#006666"
+COLOUR_BUTTON_STOP = "#660000"
 
+# Parts of the window GameGUI can repaint independently
+DISPLAY_REGIONS = ('status', 'hp', 'threats', 'tools', 'shop')
 
-class ThreatType:
-    VIRUS = "Virus"
-    WORM = "Worm"
-    TROJAN = "Trojan"
-    RANSOMWARE = "Ransomware"
-    DDOS = "DDoS Attack"
-    SPYWARE = "Spyware"
-    ZERO_DAY = "Zero-Day Exploit"
-    BOTNET = "Botnet"
-    PHISHING = "Phishing Attack"
-    MALWARE_DROPPER = "Malware Dropper"
-    DATA_BREACH = "Data Breach"
-    BRUTE_FORCE = "Brute Force Attack"
-    MITM = "MITM"
-    SOCIAL_ENGINEERING = "Social Engineering Attack"
-    SQL_INJECTION = "SQL Injection Attack"
-    KEYLOGGER = "Keylogger"
-    BOT_COMMANDER = "Bot Commander"
-
-
-class ToolType:
-    BASIC_FIREWALL = "Basic Firewall"
-    ADVANCED_FIREWALL = "Advanced Firewall"
-    ANTIVIRUS_SCANNER = "Antivirus Scanner"
-    HEURISTIC_ANTIVIRUS = "Heuristic Antivirus"
-    BACKUP_SYSTEM = "Backup System"
-    IDS = "IDS"
-    IPS = "IPS"
-    ENCRYPTION_MODULE = "Encryption Module"
-    EMAIL_FILTER = "Email Filter"
-    SANDBOX_ENVIRONMENT = "Sandbox Environment"
-    HONEYPOT = "Honeypot"
-    BEHAVIOURAL_MONITORING = "Behavioural Monitoring"
-    ANTI_BOTNET_TOOL = "Anti-Botnet Tool"
-    PORT_SCANNER = "Port Scanner"
-    VPN_SECURITY_LAYER = "VPN Security Layer"
-    CLOUD_SHIELD = "Cloud Shield"
-
-
-class Threat:
-    def __init__(self, threat_type, hp, max_hp, attack, special_active=False, turns_alive=0, detection_chance=1.0):
-        self.type = threat_type
-        self.hp = hp
-        self.max_hp = max_hp
-        self.attack = attack
-        self.special_active = special_active
-        self.turns_alive = turns_alive
-        self.detection_chance = detection_chance
-
-
-class Tool:
-    def __init__(self, tool_type, effectiveness, cost, owned=False):
-        self.type = tool_type
-        self.effectiveness = effectiveness
-        self.cost = cost
-        self.owned = owned
-
-
-class GameState:
-    def __init__(self):
-        self.server_hp = 100
-        self.max_server_hp = 100
-        self.points = 50
-        self.score = 0
-        self.turn = 1
-        self.active_threats = []
-        self.owned_tools = []
-        self.game_over = False
-        self.points_multiplier = 1.0
-        self.tool_effectiveness_multiplier = 1.0
-        self.shop_price_multiplier = 1.0
-        self.botnet_buff = 0
-        self.scans_this_turn = 0
-        self.tools_used_this_turn = 0
-        self.purchases_this_turn = 0
-
-
-class DatabaseManager:
-    def __init__(self):
-        self.conn = sqlite3.connect('cybersecurity_game.db')
-        self.create_tables()
-
-    def create_tables(self):
-        cursor = self.conn.cursor()
-        cursor.execute('''
-                       CREATE TABLE IF NOT EXISTS game_saves
-                       (
-                           id
-                           INTEGER
-                           PRIMARY
-                           KEY
-                           AUTOINCREMENT,
-                           save_name
-                           TEXT
-                           UNIQUE
-                           NOT
-                           NULL,
-                           game_data
-                           TEXT
-                           NOT
-                           NULL,
-                           created_at
-                           TIMESTAMP
-                           DEFAULT
-                           CURRENT_TIMESTAMP,
-                           updated_at
-                           TIMESTAMP
-                           DEFAULT
-                           CURRENT_TIMESTAMP
-                       )
-                       ''')
-
-        cursor.execute('''
-                       CREATE TABLE IF NOT EXISTS high_scores
-                       (
-                           id
-                           INTEGER
-                           PRIMARY
-                           KEY
-                           AUTOINCREMENT,
-                           player_name
-                           TEXT
-                           NOT
-                           NULL,
-                           score
-                           INTEGER
-                           NOT
-                           NULL,
-                           turns_survived
-                           INTEGER
-                           NOT
-                           NULL,
-                           created_at
-                           TIMESTAMP
-                           DEFAULT
-                           CURRENT_TIMESTAMP
-                       )
-                       ''')
-        self.conn.commit()
-
-    def save_game(self, save_name, game_state):
-        cursor = self.conn.cursor()
-        game_data = {
-            'server_hp': game_state.server_hp,
-            'max_server_hp': game_state.max_server_hp,
-            'points': game_state.points,
-            'score': game_state.score,
-            'turn': game_state.turn,
-            'active_threats': [self.threat_to_dict(threat) for threat in game_state.active_threats],
-            'owned_tools': game_state.owned_tools,
-            'game_over': game_state.game_over,
-            'points_multiplier': game_state.points_multiplier,
-            'tool_effectiveness_multiplier': game_state.tool_effectiveness_multiplier,
-            'shop_price_multiplier': game_state.shop_price_multiplier,
-            'botnet_buff': game_state.botnet_buff
-        }
+# Turbo mode: how often the Tk loop drains worker events, and how many per pass
+TURBO_DRAIN_MS = 50
+TURBO_DRAIN_BATCH = 2000
+LOG_MAX_LINES = 1000
 
-        cursor.execute('''
-            INSERT OR REPLACE INTO game_saves (save_name, game_data, updated_at)
-            VALUES (?, ?, CURRENT_TIMESTAMP)
-        ''', (save_name, json.dumps(game_data)))
-        self.conn.commit()
-        return True
+PROFILE_OVERLAY_MS = 1000
 
-    def threat_to_dict(self, threat):
-        return {
-            'type': threat.type,
-            'hp': threat.hp,
-            'max_hp': threat.max_hp,
-            'attack': threat.attack,
-            'special_active': threat.special_active,
-            'turns_alive': threat.turns_alive,
-            'detection_chance': threat.detection_chance
-        }
+# How often the Tk thread picks up finished background database writes
+DB_POLL_MS = 100
 
-    def load_game(self, save_name):
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT game_data FROM game_saves WHERE save_name = ?', (save_name,))
-        result = cursor.fetchone()
-
-        if result:
-            game_data = json.loads(result[0])
-            game_state = GameState()
-            game_state.server_hp = game_data['server_hp']
-            game_state.max_server_hp = game_data['max_server_hp']
-            game_state.points = game_data['points']
-            game_state.score = game_data['score']
-            game_state.turn = game_data['turn']
-            game_state.game_over = game_data['game_over']
-            game_state.points_multiplier = game_data.get('points_multiplier', 1.0)
-            game_state.tool_effectiveness_multiplier = game_data.get('tool_effectiveness_multiplier', 1.0)
-            game_state.shop_price_multiplier = game_data.get('shop_price_multiplier', 1.0)
-            game_state.botnet_buff = game_data.get('botnet_buff', 0)
-
-            # Reconstruct threats
-            for threat_data in game_data['active_threats']:
-                threat = Threat(
-                    threat_data['type'],
-                    threat_data['hp'],
-                    threat_data['max_hp'],
-                    threat_data['attack'],
-                    threat_data.get('special_active', False),
-                    threat_data.get('turns_alive', 0),
-                    threat_data.get('detection_chance', 1.0)
-                )
-                game_state.active_threats.append(threat)
-
-            # Reconstruct owned tools
-            game_state.owned_tools = game_data['owned_tools']
-
-            return game_state
-        return None
-
-    def get_save_names(self):
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT save_name FROM game_saves ORDER BY updated_at DESC')
-        return [row[0] for row in cursor.fetchall()]
-
-    def save_high_score(self, player_name, score, turns):
-        cursor = self.conn.cursor()
-        cursor.execute('''
-                       INSERT INTO high_scores (player_name, score, turns_survived)
-                       VALUES (?, ?, ?)
-                       ''', (player_name, score, turns))
-        self.conn.commit()
-
-    def get_high_scores(self, limit=10):
-        cursor = self.conn.cursor()
-        cursor.execute('''
-                       SELECT player_name, score, turns_survived, created_at
-                       FROM high_scores
-                       ORDER BY score DESC LIMIT ?
-                       ''', (limit,))
-        return cursor.fetchall()
-
-
-class Game:
-    def __init__(self):
-        self.db = DatabaseManager()
-        self.game_state = GameState()
-        self.tools_data = self.initialise_tools()
-        self.threat_weights = self.initialise_threat_weights()
-
-    def initialise_tools(self):
-        tools = {}
-
-        # Basic Firewall
-        tools[ToolType.BASIC_FIREWALL] = Tool(
-            ToolType.BASIC_FIREWALL,
-            {ThreatType.VIRUS: 0.5, ThreatType.WORM: 0.2, ThreatType.DDOS: 1.0},
-            10
-        )
+# Most saves listed in the load dialogue; sorting happens in SQL, so these are the top rows of the chosen order
+SAVE_LIST_LIMIT = 500
 
-        # Advanced Firewall
-        tools[ToolType.ADVANCED_FIREWALL] = Tool(
-            ToolType.ADVANCED_FIREWALL,
-            {ThreatType.VIRUS: 0.8, ThreatType.WORM: 0.4, ThreatType.DDOS: 1.2},
-            20
-        )
 
-        # Antivirus Scanner
-        tools[ToolType.ANTIVIRUS_SCANNER] = Tool(
-            ToolType.ANTIVIRUS_SCANNER,
-            {ThreatType.VIRUS: 1.0, ThreatType.TROJAN: 1.0, ThreatType.WORM: 0.6},
-            15
-        )
+class Game(GameEngine):
+    """Game rules plus persistence for the GUI"""
 
-        # Heuristic Antivirus
-        tools[ToolType.HEURISTIC_ANTIVIRUS] = Tool(
-            ToolType.HEURISTIC_ANTIVIRUS,
-            {ThreatType.VIRUS: 1.2, ThreatType.TROJAN: 0.8, ThreatType.WORM: 0.8, ThreatType.ZERO_DAY: 0.4},
-            25
-        )
-
-        # Backup System
-        tools[ToolType.BACKUP_SYSTEM] = Tool(
-            ToolType.BACKUP_SYSTEM,
-            {ThreatType.RANSOMWARE: 1.2, ThreatType.TROJAN: 0.5, ThreatType.VIRUS: 0.3},
-            20
-        )
+    def __init__(self, seed=None, db_path='cybersecurity_game.db'):
+        super().__init__(seed)
+        self.db = DatabaseManager(db_path)
 
-        # Intrusion Detection System
-        all_threats = [ThreatType.VIRUS, ThreatType.WORM, ThreatType.TROJAN, ThreatType.RANSOMWARE,
-                       ThreatType.DDOS, ThreatType.SPYWARE, ThreatType.ZERO_DAY, ThreatType.BOTNET,
-                       ThreatType.PHISHING, ThreatType.MALWARE_DROPPER, ThreatType.DATA_BREACH,
-                       ThreatType.BRUTE_FORCE, ThreatType.MITM, ThreatType.SOCIAL_ENGINEERING,
-                       ThreatType.SQL_INJECTION, ThreatType.KEYLOGGER, ThreatType.BOT_COMMANDER]
-
-        ids_effectiveness = {}
-        for threat in all_threats:
-            ids_effectiveness[threat] = 0.3
-
-        tools[ToolType.IDS] = Tool(
-            ToolType.IDS,
-            ids_effectiveness,
-            15
-        )
-
-        # Intrusion Prevention System
-        tools[ToolType.IPS] = Tool(
-            ToolType.IPS,
-            {ThreatType.DDOS: 1.3, ThreatType.BRUTE_FORCE: 1.0, ThreatType.WORM: 0.6},
-            30
-        )
-
-        # Encryption Module
-        tools[ToolType.ENCRYPTION_MODULE] = Tool(
-            ToolType.ENCRYPTION_MODULE,
-            {ThreatType.DATA_BREACH: 1.2, ThreatType.SPYWARE: 1.0},
-            20
-        )
-
-        # Email Filter
-        tools[ToolType.EMAIL_FILTER] = Tool(
-            ToolType.EMAIL_FILTER,
-            {ThreatType.PHISHING: 1.3, ThreatType.TROJAN: 0.3},
-            12
-        )
-
-        # Sandbox Environment
-        tools[ToolType.SANDBOX_ENVIRONMENT] = Tool(
-            ToolType.SANDBOX_ENVIRONMENT,
-            {ThreatType.ZERO_DAY: 1.0, ThreatType.VIRUS: 0.5},
-            30
-        )
-
-        # Honeypot
-        tools[ToolType.HONEYPOT] = Tool(
-            ToolType.HONEYPOT,
-            {ThreatType.RANSOMWARE: 0.5, ThreatType.WORM: 1.0, ThreatType.BOTNET: 0.7},
-            18
-        )
-
-        # Behavioural Monitoring
-        tools[ToolType.BEHAVIOURAL_MONITORING] = Tool(
-            ToolType.BEHAVIOURAL_MONITORING,
-            {ThreatType.SPYWARE: 1.3, ThreatType.TROJAN: 0.8},
-            18
-        )
-
-        # Anti-Botnet Tool
-        tools[ToolType.ANTI_BOTNET_TOOL] = Tool(
-            ToolType.ANTI_BOTNET_TOOL,
-            {ThreatType.BOTNET: 1.4, ThreatType.DDOS: 0.8},
-            25
-        )
 
-        # Port Scanner
-        tools[ToolType.PORT_SCANNER] = Tool(
-            ToolType.PORT_SCANNER,
-            {ThreatType.BRUTE_FORCE: 0.9, ThreatType.WORM: 0.4},
-            10
-        )
+class ListboxSync:
+    """Keeps a Listbox in step with a keyed list of rows, touching only the rows that changed"""
 
-        # VPN Security Layer
-        tools[ToolType.VPN_SECURITY_LAYER] = Tool(
-            ToolType.VPN_SECURITY_LAYER,
-            {ThreatType.DATA_BREACH: 0.9, ThreatType.MITM: 1.2},
-            25
-        )
+    def __init__(self, listbox):
+        self.listbox = listbox
+        self.keys = []
+        self.rows = []
 
-        # Cloud Shield
-        tools[ToolType.CLOUD_SHIELD] = Tool(
-            ToolType.CLOUD_SHIELD,
-            {ThreatType.DDOS: 1.4, ThreatType.BOTNET: 1.0},
-            30
-        )
+    def key_at(self, index):
+        if index is None or index >= len(self.keys):
+            return None
+        return self.keys[index]
 
-        return tools
+    def index_of(self, key):
+        if key is None:
+            return None
+        try:
+            return self.keys.index(key)
+        except ValueError:
+            return None
 
-    def initialise_threat_weights(self):
+    def update(self, keys, rows):
+        if keys == self.keys:
+            opcodes = [('equal', 0, len(keys), 0, len(keys))]
+        else:
+            opcodes = difflib.SequenceMatcher(None, self.keys, keys, autojunk=False).get_opcodes()
+
+        # Work backwards so the old indices of earlier blocks stay valid
+        for tag, i1, i2, j1, j2 in reversed(opcodes):
+            if tag == 'equal':
+                for offset in range(i2 - i1):
+                    if self.rows[i1 + offset] != rows[j1 + offset]:
+                        self.listbox.delete(i1 + offset)
+                        self.listbox.insert(i1 + offset, rows[j1 + offset])
+            else:
+                if i2 > i1:
+                    self.listbox.delete(i1, i2 - 1)
+                if j2 > j1:
+                    self.listbox.insert(i1, *rows[j1:j2])
+
+        self.keys = list(keys)
+        self.rows = list(rows)
+
+    def select(self, index):
+        self.listbox.selection_clear(0, tk.END)
+        if index is not None:
+            self.listbox.selection_set(index)
+
+
+class ThreatCanvas:
+    """Virtualised Active Threats view
+
+    Only the rows that fit on screen exist as canvas items. Scrolling and
+    refreshes reconfigure that fixed pool of items in place, so the cost of a
+    redraw depends on the panel height, not on how many threats are active.
+    """
+
+    ROW_HEIGHT = 18
+    NAME_WIDTH = 190
+    BAR_WIDTH = 80
+
+    def __init__(self, parent, on_select):
+        self.on_select = on_select
+        self.threats = []
+        self.top = 0
+        self.selected = None
+        self.slots = []
+
+        self.frame = tk.Frame(parent, bg=COLOUR_PANEL_BG)
+        self.scrollbar = tk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas = tk.Canvas(self.frame, bg=COLOUR_MAIN_BG, highlightthickness=0)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.canvas.bind('<Configure>', self.on_configure)
+        self.canvas.bind('<Button-1>', self.on_click)
+        self.canvas.bind('<MouseWheel>', self.on_mousewheel)
+        self.canvas.bind('<Button-4>', lambda event: self.scroll_rows(-3))
+        self.canvas.bind('<Button-5>', lambda event: self.scroll_rows(3))
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def visible_rows(self):
+        return max(1, self.canvas.winfo_height() // self.ROW_HEIGHT)
+
+    def create_slot(self, index):
+        top = index * self.ROW_HEIGHT
+        middle = top + self.ROW_HEIGHT // 2
+        bar_left = self.NAME_WIDTH
         return {
-            ThreatType.VIRUS: 1.0,
-            ThreatType.WORM: 0.8,
-            ThreatType.TROJAN: 0.9,
-            ThreatType.RANSOMWARE: 0.6,
-            ThreatType.DDOS: 0.7,
-            ThreatType.SPYWARE: 0.8,
-            ThreatType.ZERO_DAY: 0.3,
-            ThreatType.BOTNET: 0.5,
-            ThreatType.PHISHING: 0.9,
-            ThreatType.MALWARE_DROPPER: 0.6,
-            ThreatType.DATA_BREACH: 0.4,
-            ThreatType.BRUTE_FORCE: 0.7,
-            ThreatType.MITM: 0.5,
-            ThreatType.SOCIAL_ENGINEERING: 0.4,
-            ThreatType.SQL_INJECTION: 0.6,
-            ThreatType.KEYLOGGER: 0.7,
-            ThreatType.BOT_COMMANDER: 0.2
-        }
-
-    def generate_threats(self):
-        threat_count = min(1 + self.game_state.turn // 3, 4)
-        threats = []
-
-        for i in range(threat_count):
-            # Weighted random selection
-            threat_types = list(self.threat_weights.keys())
-            weights = list(self.threat_weights.values())
-            threat_type = self.weighted_choice(threat_types, weights)
-
-            base_hp = 15 + (self.game_state.turn * 2)
-            base_attack = 5 + self.game_state.turn
-
-            # Apply botnet buff if applicable
-            if threat_type == ThreatType.BOTNET:
-                base_hp += self.game_state.botnet_buff * 5
-                base_attack += self.game_state.botnet_buff * 2
-
-            threat = Threat(
-                threat_type,
-                base_hp,
-                base_hp,
-                base_attack
-            )
-
-            # Special properties
-            if threat_type == ThreatType.TROJAN:
-                threat.detection_chance = 0.7
-
-            threats.append(threat)
-
-        return threats
-
-    def weighted_choice(self, choices, weights):
-        total = sum(weights)
-        r = random.uniform(0, total)
-        upto = 0
-        for choice, weight in zip(choices, weights):
-            if upto + weight >= r:
-                return choice
-            upto += weight
-        return choices[-1]
-
-    def use_tool(self, tool_type, target_threat):
-        if tool_type not in self.game_state.owned_tools:
-            return {"error": "Tool not owned"}
-
-        tool = self.tools_data[tool_type]
-        effectiveness = tool.effectiveness.get(target_threat.type, 0.1)
-        effectiveness *= self.game_state.tool_effectiveness_multiplier
-
-        # Calculate damage
-        base_damage = 20
-        damage = int(base_damage * effectiveness)
-
-        # Apply damage
-        target_threat.hp = max(0, target_threat.hp - damage)
-
-        result = {
-            "damage": damage,
-            "threat_defeated": target_threat.hp <= 0,
-            "effectiveness": effectiveness
+            'background': self.canvas.create_rectangle(0, top, 4000, top + self.ROW_HEIGHT,
+                                                       fill=COLOUR_MAIN_BG, width=0, state=tk.HIDDEN),
+            'name': self.canvas.create_text(4, middle, anchor=tk.W, fill=COLOUR_TEXT_PRIMARY,
+                                            font=('Courier', 9), state=tk.HIDDEN),
+            'bar_back': self.canvas.create_rectangle(bar_left, top + 4, bar_left + self.BAR_WIDTH,
+                                                     top + self.ROW_HEIGHT - 4, fill=COLOUR_PANEL_BG,
+                                                     outline=COLOUR_TEXT_SECONDARY, state=tk.HIDDEN),
+            'bar': self.canvas.create_rectangle(bar_left, top + 4, bar_left, top + self.ROW_HEIGHT - 4,
+                                                fill=COLOUR_HP_BAR, width=0, state=tk.HIDDEN),
+            'stats': self.canvas.create_text(bar_left + self.BAR_WIDTH + 6, middle, anchor=tk.W,
+                                             fill=COLOUR_TEXT_PRIMARY, font=('Courier', 9), state=tk.HIDDEN),
+            'top': top,
+            'drawn': None,
         }
 
-        return result
-
-    def process_threat_specials(self):
-        """Process special abilities of threats"""
-        new_threats = []
-
-        for threat in self.game_state.active_threats[:]:
-            threat.turns_alive += 1
-
-            # Virus: Splits into 2 if ignored for 3 turns
-            if (threat.type == ThreatType.VIRUS and
-                    threat.turns_alive >= 3 and not threat.special_active):
-                new_virus = Threat(ThreatType.VIRUS, threat.hp // 2, threat.max_hp // 2, threat.attack // 2)
-                new_threats.append(new_virus)
-                threat.special_active = True
-
-            # Brute Force: Damage increases over time
-            elif threat.type == ThreatType.BRUTE_FORCE:
-                threat.attack += 2
-
-            # Ransomware: Doubles damage if not stopped within 2 turns
-            elif (threat.type == ThreatType.RANSOMWARE and
-                  threat.turns_alive >= 2 and not threat.special_active):
-                threat.attack *= 2
-                threat.special_active = True
-
-        self.game_state.active_threats.extend(new_threats)
-
-    def process_threat_attacks(self):
-        """Process threat attacks and special effects"""
-        total_damage = 0
-
-        for threat in self.game_state.active_threats:
-            if threat.type == ThreatType.WORM:
-                # Attacks twice
-                total_damage += threat.attack * 2
-            elif threat.type == ThreatType.DDOS:
-                # Ignores weak firewalls (simplified: just does full damage)
-                total_damage += threat.attack
+    def draw_slot(self, slot, threat, selected):
+        # Skip the Tk calls entirely when this slot already shows the same thing
+        drawn = (threat.type, threat.hp, threat.max_hp, threat.attack, threat.detection_chance < 1.0, selected)
+        if drawn == slot['drawn']:
+            return
+        if slot['drawn'] is None:
+            for item in ('background', 'name', 'bar_back', 'bar', 'stats'):
+                self.canvas.itemconfigure(slot[item], state=tk.NORMAL)
+
+        stats_text = "HP:" + str(threat.hp) + "/" + str(threat.max_hp) + " ATK:" + str(threat.attack)
+        if threat.detection_chance < 1.0:
+            stats_text += " [HIDDEN]"
+        bar_left = self.NAME_WIDTH
+        bar_right = bar_left + self.BAR_WIDTH * max(0, threat.hp) // max(1, threat.max_hp)
+
+        self.canvas.itemconfigure(slot['background'], fill=COLOUR_THREAT_HIGHLIGHT if selected else COLOUR_MAIN_BG)
+        self.canvas.itemconfigure(slot['name'], text=THREAT_NAMES[threat.type])
+        self.canvas.itemconfigure(slot['stats'], text=stats_text)
+        self.canvas.coords(slot['bar'], bar_left, slot['top'] + 4, bar_right, slot['top'] + self.ROW_HEIGHT - 4)
+        slot['drawn'] = drawn
+
+    def hide_slot(self, slot):
+        if slot['drawn'] is None:
+            return
+        for item in ('background', 'name', 'bar_back', 'bar', 'stats'):
+            self.canvas.itemconfigure(slot[item], state=tk.HIDDEN)
+        slot['drawn'] = None
+
+    def redraw(self):
+        for offset, slot in enumerate(self.slots):
+            row = self.top + offset
+            if row < len(self.threats):
+                self.draw_slot(slot, self.threats[row], row == self.selected)
             else:
-                total_damage += threat.attack
-
-            # Special effects
-            if threat.type == ThreatType.SPYWARE:
-                self.game_state.points_multiplier *= 0.95
-            elif threat.type == ThreatType.DATA_BREACH:
-                self.game_state.max_server_hp = max(10, self.game_state.max_server_hp - 2)
-            elif threat.type == ThreatType.MITM:
-                self.game_state.tool_effectiveness_multiplier *= 0.98
-            elif threat.type == ThreatType.SOCIAL_ENGINEERING:
-                self.game_state.shop_price_multiplier *= 1.02
-            elif threat.type == ThreatType.KEYLOGGER:
-                self.game_state.points_multiplier *= 0.97
-            elif threat.type == ThreatType.BOT_COMMANDER:
-                self.game_state.botnet_buff += 1
-
-        self.game_state.server_hp = max(0, self.game_state.server_hp - total_damage)
-
-        if self.game_state.server_hp <= 0:
-            self.game_state.game_over = True
-
-    def process_defeated_threats(self):
-        """Process effects when threats are defeated"""
-        points_earned = 0
-        new_threats = []
-
-        for threat in self.game_state.active_threats[:]:
-            if threat.hp <= 0:
-                # Base points for defeating threat
-                base_points = 10 + (self.game_state.turn * 2)
-                points_earned += int(base_points * self.game_state.points_multiplier)
-
-                # Special death effects
-                if threat.type == ThreatType.MALWARE_DROPPER:
-                    # Spawns another threat
-                    threat_types = list(self.threat_weights.keys())
-                    new_threat_type = random.choice(threat_types)
-                    new_threat = Threat(
-                        new_threat_type,
-                        10,
-                        10,
-                        5
-                    )
-                    new_threats.append(new_threat)
-
-                self.game_state.active_threats.remove(threat)
-
-        self.game_state.active_threats.extend(new_threats)
-        self.game_state.points += points_earned
-        self.game_state.score += points_earned
-
-        return points_earned
-
-    def buy_tool(self, tool_type):
-        tool = self.tools_data[tool_type]
-        cost = int(tool.cost * self.game_state.shop_price_multiplier)
-
-        if self.game_state.points >= cost and tool_type not in self.game_state.owned_tools:
-            self.game_state.points -= cost
-            self.game_state.owned_tools.append(tool_type)
-            return True
-        return False
+                self.hide_slot(slot)
 
-    def next_turn(self):
-        self.game_state.turn += 1
-        self.game_state.scans_this_turn = 0
-        self.game_state.tools_used_this_turn = 0
-        self.process_threat_specials()
+        if self.threats:
+            self.scrollbar.set(self.top / len(self.threats),
+                               min(1.0, (self.top + self.visible_rows()) / len(self.threats)))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def scroll_to(self, top):
+        top = max(0, min(top, len(self.threats) - self.visible_rows()))
+        if top != self.top:
+            self.top = top
+            self.redraw()
+
+    def scroll_rows(self, count):
+        self.scroll_to(self.top + count)
+
+    def yview(self, *args):
+        if args[0] == 'moveto':
+            self.scroll_to(int(float(args[1]) * len(self.threats)))
+        elif args[0] == 'scroll':
+            count = int(args[1])
+            if args[2] == 'pages':
+                count *= self.visible_rows()
+            self.scroll_rows(count)
+
+    def on_configure(self, event):
+        needed = event.height // self.ROW_HEIGHT + 1
+        while len(self.slots) < needed:
+            self.slots.append(self.create_slot(len(self.slots)))
+        self.scroll_to(self.top)
+        self.redraw()
+
+    def on_mousewheel(self, event):
+        self.scroll_rows(-3 if event.delta > 0 else 3)
+
+    def on_click(self, event):
+        row = self.top + event.y // self.ROW_HEIGHT
+        if row < len(self.threats):
+            self.select(row)
+            self.on_select(row)
+
+    def key_at(self, index):
+        if index is None or index >= len(self.threats):
+            return None
+        return self.threats[index]
+
+    def index_of(self, threat):
+        if threat is None:
+            return None
+        try:
+            return self.threats.index(threat)
+        except ValueError:
+            return None
+
+    def update(self, threats):
+        # Snapshot the order so the selection can be matched back after the engine mutates the list
+        self.threats = list(threats)
+        self.top = max(0, min(self.top, len(self.threats) - self.visible_rows()))
+        self.redraw()
+
+    def select(self, index):
+        if index != self.selected:
+            self.selected = index
+            self.redraw()
 
 
 class GameGUI:
-    def __init__(self, username):
+    def __init__(self, username, profile=False, profile_path=None, db_path='cybersecurity_game.db'):
         self.username = username  # store username
-        self.game = Game()
+        self.game = Game(db_path=db_path)
         self.root = tk.Tk()
         self.root.title(f"Cybersecurity Defence Game - {self.username}")
         self.root.geometry("1200x800")
@@ -599,339 +276,453 @@ class GameGUI:
 
         self.selected_tool = None
         self.selected_threat = None
+        self.dirty_regions = set()
+        self.redraw_pending = None
+        self.turbo_thread = None
+        self.turbo_stop = None
+        self.turbo_events = queue.Queue()
+        # The worker's newest state, waiting for the next drain; one slot, so it never backs up
+        self.turbo_latest = None
+        self.turbo_latest_lock = threading.Lock()
+        self.db_events = queue.Queue()
+        self.db_pending = 0
+        self.monitor = None
+        self.profile_path = profile_path
+        self.profile_overlay = None
+        self.journal = TurnJournal(self.game.db, str(self.username))
+
+        # Has to happen before setup_ui so the buttons bind the timed handlers
+        if profile:
+            self.attach_monitor()
+
+        # Closing the window has to flush queued saves before the process goes
+        self.root.protocol('WM_DELETE_WINDOW', self.close)
 
         self.setup_ui()
+        self.recover_autosave()
         self.update_display()
 
-    import tkinter as tk
-    from tkinter import ttk, messagebox, simpledialog
-    import sqlite3
-    import json
-    import random
-    import math
-
-    # COLOUR palette
-    COLOUR_MAIN_BG = "#1A1A1A"
-    COLOUR_PANEL_BG = "#2D2D2D"
-    COLOUR_THREAT_HIGHLIGHT = "#FF4C4C"
-    COLOUR_TOOL_HIGHLIGHT = "#4C8BFF"
-    COLOUR_SHOP_SECTION = "#3B3B3B"
-    COLOUR_TEXT_PRIMARY = "#FFFFFF"
-    COLOUR_TEXT_SECONDARY = "#C7C7C7"
-    COLOUR_HP_BAR = "#00FF00"
-    COLOUR_BUTTON_SCAN = "#0066CC"
-    COLOUR_BUTTON_USE_TOOL = "#CC6600"
-    COLOUR_BUTTON_NEXT_TURN = "#006600"
-    COLOUR_BUTTON_SAVE = "#660066"
-    COLOUR_BUTTON_LOAD = "#666600"
-    COLOUR_BUTTON_HS = "#CC0066"
-
-    class ThreatType:
-        VIRUS = "Virus"
-        WORM = "Worm"
-        TROJAN = "Trojan"
-        RANSOMWARE = "Ransomware"
-        DDOS = "DDoS Attack"
-        SPYWARE = "Spyware"
-        ZERO_DAY = "Zero-Day Exploit"
-        BOTNET = "Botnet"
-        PHISHING = "Phishing Attack"
-        MALWARE_DROPPER = "Malware Dropper"
-        DATA_BREACH = "Data Breach"
-        BRUTE_FORCE = "Brute Force Attack"
-        MITM = "MITM"
-        SOCIAL_ENGINEERING = "Social Engineering Attack"
-        SQL_INJECTION = "SQL Injection Attack"
-        KEYLOGGER = "Keylogger"
-        BOT_COMMANDER = "Bot Commander"
-
-    class ToolType:
-        BASIC_FIREWALL = "Basic Firewall"
-        ADVANCED_FIREWALL = "Advanced Firewall"
-        ANTIVIRUS_SCANNER = "Antivirus Scanner"
-        HEURISTIC_ANTIVIRUS = "Heuristic Antivirus"
-        BACKUP_SYSTEM = "Backup System"
-        IDS = "IDS"
-        IPS = "IPS"
-        ENCRYPTION_MODULE = "Encryption Module"
-        EMAIL_FILTER = "Email Filter"
-        SANDBOX_ENVIRONMENT = "Sandbox Environment"
-        HONEYPOT = "Honeypot"
-        BEHAVIOURAL_MONITORING = "Behavioural Monitoring"
-        ANTI_BOTNET_TOOL = "Anti-Botnet Tool"
-        PORT_SCANNER = "Port Scanner"
-        VPN_SECURITY_LAYER = "VPN Security Layer"
-        CLOUD_SHIELD = "Cloud Shield"
-
-    class Threat:
-        def __init__(self, threat_type, hp, max_hp, attack, special_active=False, turns_alive=0, detection_chance=1.0):
-            self.type = threat_type
-            self.hp = hp
-            self.max_hp = max_hp
-            self.attack = attack
-            self.special_active = special_active
-            self.turns_alive = turns_alive
-            self.detection_chance = detection_chance
-
-    class Tool:
-        def __init__(self, tool_type, effectiveness, cost, owned=False):
-            self.type = tool_type
-            self.effectiveness = effectiveness
-            self.cost = cost
-            self.owned = owned
-
-    class GameState:
-        def __init__(self):
-            self.server_hp = 100
-            self.max_server_hp = 100
-            self.points = 50
-            self.score = 0
-            self.turn = 1
-            self.active_threats = []
-            self.owned_tools = []
-            self.game_over = False
-            self.points_multiplier = 1.0
-            self.tool_effectiveness_multiplier = 1.0
-            self.shop_price_multiplier = 1.0
-            self.botnet_buff = 0
-            self.scans_this_turn = 0
-            self.tools_used_this_turn = 0
-            self.purchases_this_turn = 0
-
-    class DatabaseManager:
-        def __init__(self):
-            self.conn = sqlite3.connect('cybersecurity_game.db')
-            self.create_tables()
-
-        def create_tables(self):
-            cursor = self.conn.cursor()
-            cursor.execute('''...''')  # same as original
-
-            cursor.execute('''...''')  # same as original
-            self.conn.commit()
-
-        def save_game(self, save_name, game_state):
-            cursor = self.conn.cursor()
-            game_data = {
-                'server_hp': game_state.server_hp,
-                'max_server_hp': game_state.max_server_hp,
-                'points': game_state.points,
-                'score': game_state.score,
-                'turn': game_state.turn,
-                'active_threats': [self.threat_to_dict(threat) for threat in game_state.active_threats],
-                'owned_tools': game_state.owned_tools,
-                'game_over': game_state.game_over,
-                'points_multiplier': game_state.points_multiplier,
-                'tool_effectiveness_multiplier': game_state.tool_effectiveness_multiplier,
-                'shop_price_multiplier': game_state.shop_price_multiplier,
-                'botnet_buff': game_state.botnet_buff
-            }
-
-            cursor.execute('''...''')  # same as original
-            self.conn.commit()
-            return True
+    def recover_autosave(self):
+        """Offer to resume the game the journal was following when this player last quit or crashed"""
+        try:
+            recovered = self.journal.recover()
+        except Exception as error:
+            # A journal that can't be read back is only an autosave; start a new game rather than not start
+            self.log("Could not recover the autosaved game (" + str(error) + ") - starting a new game.")
+            recovered = None
+        if recovered is not None and not recovered.game_over:
+            if self.dialog(messagebox.askyesno, "Recover Game", "Resume your unfinished game from turn " +
+                                   str(recovered.turn) + "?"):
+                self.game.game_state = recovered
+        self.journal.start(self.game.game_state)
+
+    def attach_monitor(self):
+        """Time GUI handlers, engine and database calls, and main-loop lag; F12 shows the numbers"""
+        self.monitor = LatencyMonitor()
+        self.monitor.wrap(self, ('scan_threats', 'use_tool', 'buy_tool', 'next_turn', 'save_game', 'load_game',
+                                 'show_high_scores', 'update_display', 'drain_turbo_events', 'poll_db_events'),
+                          'gui.')
+        # The *_async calls only time queueing; each batch the writer thread commits is timed on its own
+        self.monitor.wrap(self.game.db, ('save_game_async', 'save_high_score_async', 'append_journal_async',
+                                         'load_game', 'get_high_scores_page', 'get_rank', 'list_saves',
+                                         'read_journal', 'clear_journal'),
+                          'db.')
+        self.game.db.apply_writes = self.monitor.timed('db.writer.batch', self.game.db.apply_writes, pausable=False)
+        self.monitor.start_heartbeat(self.root)
+        self.root.bind('<F12>', self.toggle_profile_overlay)
+        self.root.bind('<F11>', lambda event: self.dump_profile())
+
+    def measure(self, name):
+        # Engine calls are timed here rather than wrapped, so forks of the game stay untouched
+        if self.monitor is None:
+            return contextlib.nullcontext()
+        return self.monitor.measure(name)
+
+    def dialog(self, show, *args):
+        """show(*args), with the time the player keeps the dialog open left out of the latency numbers"""
+        if self.monitor is None:
+            return show(*args)
+        with self.monitor.paused():
+            return show(*args)
+
+    def toggle_profile_overlay(self, event=None):
+        if self.profile_overlay is not None:
+            self.profile_overlay.destroy()
+            self.profile_overlay = None
+            return
+
+        self.profile_overlay = tk.Toplevel(self.root)
+        self.profile_overlay.title("Performance")
+        self.profile_overlay.configure(bg=COLOUR_PANEL_BG)
+        self.profile_overlay.protocol('WM_DELETE_WINDOW', self.toggle_profile_overlay)
+        self.profile_label = tk.Label(self.profile_overlay, text="", justify=tk.LEFT, font=('Courier', 9),
+                                      bg=COLOUR_PANEL_BG, fg=COLOUR_TEXT_PRIMARY)
+        self.profile_label.pack(padx=10, pady=10)
+        self.refresh_profile_overlay()
+
+    def refresh_profile_overlay(self):
+        if self.profile_overlay is None:
+            return
+        self.profile_label.config(text="Times in ms, leaving out time spent waiting in dialogs\n\n" +
+                                       self.monitor.report())
+        self.root.after(PROFILE_OVERLAY_MS, self.refresh_profile_overlay)
+
+    def dump_profile(self):
+        path = self.profile_path or 'latency_profile.json'
+        self.monitor.dump(path)
+        self.log("Latency profile written to " + path)
+
+    def close(self):
+        if self.monitor is not None and self.profile_path:
+            self.monitor.dump(self.profile_path)
+        self.stop_turbo()
+        self.game.db.close()
+        self.root.destroy()
+
+    def setup_ui(self):
+        main_frame = tk.Frame(self.root, bg=COLOUR_MAIN_BG)
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        top_frame = tk.Frame(main_frame, bg=COLOUR_MAIN_BG, relief=tk.RAISED, bd=2)
+        top_frame.pack(fill=tk.X, pady=(0, 10))
+
+        self.status_label = tk.Label(
+            top_frame,
+            text="",
+            font=('Arial', 12, 'bold'),
+            bg=COLOUR_PANEL_BG,
+            fg=COLOUR_HP_BAR
+        )
+        self.status_label.pack(pady=10)
+
+        hp_frame = tk.Frame(top_frame, bg=COLOUR_PANEL_BG)
+        hp_frame.pack(pady=5)
+
+        tk.Label(hp_frame, text="Server HP:", bg=COLOUR_PANEL_BG, fg=COLOUR_TEXT_PRIMARY).pack(side=tk.LEFT)
+        self.hp_bar = ttk.Progressbar(hp_frame, length=300, mode='determinate')
+        self.hp_bar.pack(side=tk.LEFT, padx=10)
+        self.hp_label = tk.Label(hp_frame, text="", bg=COLOUR_PANEL_BG, fg=COLOUR_TEXT_PRIMARY)
+        self.hp_label.pack(side=tk.LEFT)
+
+        middle_frame = tk.Frame(main_frame, bg=COLOUR_MAIN_BG)
+        middle_frame.pack(fill=tk.BOTH, expand=True)
+
+        threats_frame = tk.LabelFrame(
+            middle_frame,
+            text="Active Threats",
+            bg=COLOUR_PANEL_BG,
+            fg=COLOUR_THREAT_HIGHLIGHT,
+            font=('Arial', 10, 'bold')
+        )
+        threats_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 5))
+
+        self.threats_view = ThreatCanvas(threats_frame, self.on_threat_select)
+        self.threats_view.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+        tools_frame = tk.LabelFrame(
+            middle_frame,
+            text="Owned Tools",
+            bg=COLOUR_PANEL_BG,
+            fg=COLOUR_TOOL_HIGHLIGHT,
+            font=('Arial', 10, 'bold')
+        )
+        tools_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5)
+
+        self.tools_listbox = tk.Listbox(
+            tools_frame,
+            bg=COLOUR_MAIN_BG,
+            fg=COLOUR_TEXT_PRIMARY,
+            selectbackground=COLOUR_TOOL_HIGHLIGHT,
+            font=('Courier', 9),
+            exportselection=False
+        )
+        self.tools_listbox.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.tools_listbox.bind('<<ListboxSelect>>', self.on_tool_select)
+
+        shop_frame = tk.LabelFrame(
+            middle_frame,
+            text="Tool Shop",
+            bg=COLOUR_PANEL_BG,
+            fg=COLOUR_SHOP_SECTION,
+            font=('Arial', 10, 'bold')
+        )
+        shop_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(5, 0))
+
+        self.shop_listbox = tk.Listbox(
+            shop_frame,
+            bg=COLOUR_MAIN_BG,
+            fg=COLOUR_TEXT_PRIMARY,
+            selectbackground=COLOUR_SHOP_SECTION,
+            font=('Courier', 9),
+            exportselection=False
+        )
+        self.shop_listbox.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.shop_listbox.bind('<Double-Button-1>', self.buy_tool)
+
+        self.tools_view = ListboxSync(self.tools_listbox)
+        self.shop_view = ListboxSync(self.shop_listbox)
+
+        controls_frame = tk.Frame(main_frame, bg=COLOUR_PANEL_BG, relief=tk.RAISED, bd=2)
+        controls_frame.pack(fill=tk.X, pady=(10, 0))
+
+        button_frame = tk.Frame(controls_frame, bg=COLOUR_PANEL_BG)
+        button_frame.pack(pady=10)
+
+        tk.Button(button_frame, text="Scan for Threats", command=self.scan_threats,
+                  bg=COLOUR_BUTTON_SCAN,
+                  fg=COLOUR_TEXT_PRIMARY,
+                  font=('Arial', 10, 'bold')).pack(side=tk.LEFT, padx=5)
+
+        tk.Button(button_frame, text="Use Tool", command=self.use_tool,
+                  bg=COLOUR_BUTTON_USE_TOOL,
+                  fg=COLOUR_TEXT_PRIMARY,
+                  font=('Arial', 10, 'bold')).pack(side=tk.LEFT, padx=5)
+
+        tk.Button(button_frame, text="Next Turn", command=self.next_turn,
+                  bg=COLOUR_BUTTON_NEXT_TURN,
+                  fg=COLOUR_TEXT_PRIMARY,
+                  font=('Arial', 10, 'bold')).pack(side=tk.LEFT, padx=5)
+
+        tk.Button(button_frame, text="Save Game", command=self.save_game,
+                  bg=COLOUR_BUTTON_SAVE,
+                  fg=COLOUR_TEXT_PRIMARY,
+                  font=('Arial', 10, 'bold')).pack(side=tk.LEFT, padx=5)
+
+        tk.Button(button_frame, text="Load Game", command=self.load_game,
+                  bg=COLOUR_BUTTON_LOAD,
+                  fg=COLOUR_TEXT_PRIMARY,
+                  font=('Arial', 10, 'bold')).pack(side=tk.LEFT, padx=5)
+
+        tk.Button(button_frame, text="High Scores", command=self.show_high_scores,
+                  bg=COLOUR_BUTTON_HS,
+                  fg=COLOUR_TEXT_PRIMARY,
+                  font=('Arial', 10, 'bold')).pack(side=tk.LEFT, padx=5)
+
+        turbo_frame = tk.Frame(controls_frame, bg=COLOUR_PANEL_BG)
+        turbo_frame.pack(pady=(0, 10))
+
+        tk.Label(turbo_frame, text="Turbo turns:", bg=COLOUR_PANEL_BG, fg=COLOUR_TEXT_PRIMARY).pack(side=tk.LEFT)
+        self.turbo_turns = tk.StringVar(value="50")
+        tk.Spinbox(turbo_frame, from_=1, to=100000, width=7, textvariable=self.turbo_turns).pack(side=tk.LEFT, padx=5)
+
+        tk.Label(turbo_frame, text="Policy:", bg=COLOUR_PANEL_BG, fg=COLOUR_TEXT_PRIMARY).pack(side=tk.LEFT)
+        self.turbo_policy = tk.StringVar(value='greedy')
+        tk.OptionMenu(turbo_frame, self.turbo_policy, *sorted(POLICIES)).pack(side=tk.LEFT, padx=5)
+
+        tk.Button(turbo_frame, text="Turbo", command=self.start_turbo,
+                  bg=COLOUR_BUTTON_TURBO,
+                  fg=COLOUR_TEXT_PRIMARY,
+                  font=('Arial', 10, 'bold')).pack(side=tk.LEFT, padx=5)
+
+        tk.Button(turbo_frame, text="Stop", command=self.stop_turbo,
+                  bg=COLOUR_BUTTON_STOP,
+                  fg=COLOUR_TEXT_PRIMARY,
+                  font=('Arial', 10, 'bold')).pack(side=tk.LEFT, padx=5)
+
+        log_frame = tk.LabelFrame(
+            main_frame,
+            text="Event Log",
+            bg=COLOUR_PANEL_BG,
+            fg=COLOUR_TEXT_SECONDARY,
+            font=('Arial', 10, 'bold')
+        )
+        log_frame.pack(fill=tk.X, pady=(10, 0))
+
+        log_scrollbar = tk.Scrollbar(log_frame, orient=tk.VERTICAL)
+        log_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.log_text = tk.Text(
+            log_frame,
+            height=8,
+            bg=COLOUR_MAIN_BG,
+            fg=COLOUR_TEXT_SECONDARY,
+            font=('Courier', 9),
+            state=tk.DISABLED,
+            yscrollcommand=log_scrollbar.set
+        )
+        self.log_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        log_scrollbar.config(command=self.log_text.yview)
+
+    def request_redraw(self, *regions):
+        """Mark regions dirty and repaint them once, the next time Tk goes idle
+
+        Handlers call this instead of update_display, so several changes in one
+        event-loop tick cost a single pass over only the regions they touched.
+        """
+        self.dirty_regions.update(regions or DISPLAY_REGIONS)
+        if self.redraw_pending is None:
+            self.redraw_pending = self.root.after_idle(self.flush_redraw)
+
+    def flush_redraw(self):
+        self.redraw_pending = None
+        regions = self.dirty_regions
+        self.dirty_regions = set()
+        self.update_display(regions)
+
+    def update_display(self, regions=DISPLAY_REGIONS):
+        game_state = self.game.game_state
 
-        def threat_to_dict(self, threat):
-            return {...}  # same as original
-
-        def load_game(self, save_name):
-            ...  # same as original
-
-        def get_save_names(self):
-            ...  # same as original
-
-        def save_high_score(self, player_name, score, turns):
-            ...  # same as original
-
-        def get_high_scores(self, limit=10):
-            ...  # same as original
-
-    class Game:
-        ...  # same as original, no color changes here
-
-    class GameGUI:
-        def __init__(self, username):
-            self.username = username  # store username
-            self.game = Game()
-            self.root = tk.Tk()
-            self.root.title(f"Cybersecurity Defence Game - {self.username}")
-            self.root.geometry("1200x800")
-            self.root.configure(bg=COLOUR_MAIN_BG)
-
-            self.selected_tool = None
-            self.selected_threat = None
-
-            self.setup_ui()
-            self.update_display()
-
-        def setup_ui(self):
-            main_frame = tk.Frame(self.root, bg=COLOUR_MAIN_BG)
-            main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-
-            top_frame = tk.Frame(main_frame, bg=COLOUR_MAIN_BG, relief=tk.RAISED, bd=2)
-            top_frame.pack(fill=tk.X, pady=(0, 10))
-
-            self.status_label = tk.Label(
-                top_frame,
-                text="",
-                font=('Arial', 12, 'bold'),
-                bg=COLOUR_PANEL_BG,
-                fg=COLOUR_HP_BAR
-            )
-            self.status_label.pack(pady=10)
-
-            hp_frame = tk.Frame(top_frame, bg=COLOUR_PANEL_BG)
-            hp_frame.pack(pady=5)
-
-            tk.Label(hp_frame, text="Server HP:", bg=COLOUR_PANEL_BG, fg=COLOUR_TEXT_PRIMARY).pack(side=tk.LEFT)
-            self.hp_bar = ttk.Progressbar(hp_frame, length=300, mode='determinate')
-            self.hp_bar.pack(side=tk.LEFT, padx=10)
-            self.hp_label = tk.Label(hp_frame, text="", bg=COLOUR_PANEL_BG, fg=COLOUR_TEXT_PRIMARY)
-            self.hp_label.pack(side=tk.LEFT)
-
-            middle_frame = tk.Frame(main_frame, bg=COLOUR_MAIN_BG)
-            middle_frame.pack(fill=tk.BOTH, expand=True)
-
-            threats_frame = tk.LabelFrame(
-                middle_frame,
-                text="Active Threats",
-                bg=COLOUR_PANEL_BG,
-                fg=COLOUR_THREAT_HIGHLIGHT,
-                font=('Arial', 10, 'bold')
-            )
-            threats_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 5))
-
-            self.threats_listbox = tk.Listbox(
-                threats_frame,
-                bg=COLOUR_MAIN_BG,
-                fg=COLOUR_TEXT_PRIMARY,
-                selectbackground=COLOUR_THREAT_HIGHLIGHT,
-                font=('Courier', 9)
-            )
-            self.threats_listbox.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-            self.threats_listbox.bind('<<ListboxSelect>>', self.on_threat_select)
-
-            tools_frame = tk.LabelFrame(
-                middle_frame,
-                text="Owned Tools",
-                bg=COLOUR_PANEL_BG,
-                fg=COLOUR_TOOL_HIGHLIGHT,
-                font=('Arial', 10, 'bold')
-            )
-            tools_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5)
-
-            self.tools_listbox = tk.Listbox(
-                tools_frame,
-                bg=COLOUR_MAIN_BG,
-                fg=COLOUR_TEXT_PRIMARY,
-                selectbackground=COLOUR_TOOL_HIGHLIGHT,
-                font=('Courier', 9)
-            )
-            self.tools_listbox.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-            self.tools_listbox.bind('<<ListboxSelect>>', self.on_tool_select)
-
-            shop_frame = tk.LabelFrame(
-                middle_frame,
-                text="Tool Shop",
-                bg=COLOUR_PANEL_BG,
-                fg=COLOUR_SHOP_SECTION,
-                font=('Arial', 10, 'bold')
-            )
-            shop_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(5, 0))
-
-            self.shop_listbox = tk.Listbox(
-                shop_frame,
-                bg=COLOUR_MAIN_BG,
-                fg=COLOUR_TEXT_PRIMARY,
-                selectbackground=COLOUR_SHOP_SECTION,
-                font=('Courier', 9)
-            )
-            self.shop_listbox.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-            self.shop_listbox.bind('<Double-Button-1>', self.buy_tool)
-
-            controls_frame = tk.Frame(main_frame, bg=COLOUR_PANEL_BG, relief=tk.RAISED, bd=2)
-            controls_frame.pack(fill=tk.X, pady=(10, 0))
-
-            button_frame = tk.Frame(controls_frame, bg=COLOUR_PANEL_BG)
-            button_frame.pack(pady=10)
-
-            tk.Button(button_frame, text="Scan for Threats", command=self.scan_threats,
-                      bg=COLOUR_BUTTON_SCAN,
-                      fg=COLOUR_TEXT_PRIMARY,
-                      font=('Arial', 10, 'bold')).pack(side=tk.LEFT, padx=5)
-
-            tk.Button(button_frame, text="Use Tool", command=self.use_tool,
-                      bg=COLOUR_BUTTON_USE_TOOL,
-                      fg=COLOUR_TEXT_PRIMARY,
-                      font=('Arial', 10, 'bold')).pack(side=tk.LEFT, padx=5)
-
-            tk.Button(button_frame, text="Next Turn", command=self.next_turn,
-                      bg=COLOUR_BUTTON_NEXT_TURN,
-                      fg=COLOUR_TEXT_PRIMARY,
-                      font=('Arial', 10, 'bold')).pack(side=tk.LEFT, padx=5)
-
-            tk.Button(button_frame, text="Save Game", command=self.save_game,
-                      bg=COLOUR_BUTTON_SAVE,
-                      fg=COLOUR_TEXT_PRIMARY,
-                      font=('Arial', 10, 'bold')).pack(side=tk.LEFT, padx=5)
-
-            tk.Button(button_frame, text="Load Game", command=self.load_game,
-                      bg=COLOUR_BUTTON_LOAD,
-                      fg=COLOUR_TEXT_PRIMARY,
-                      font=('Arial', 10, 'bold')).pack(side=tk.LEFT, padx=5)
-
-            tk.Button(button_frame, text="High Scores", command=self.show_high_scores,
-                      bg=COLOUR_BUTTON_HS,
-                      fg=COLOUR_TEXT_PRIMARY,
-                      font=('Arial', 10, 'bold')).pack(side=tk.LEFT, padx=5)
-
-            self.game.game_state.owned_tools = [ToolType.BASIC_FIREWALL, ToolType.ANTIVIRUS_SCANNER]
-
-
-    def update_display(self):
         # Update status
-        status_text = "Turn: " + str(self.game.game_state.turn) + " | Points: " + str(
-            self.game.game_state.points) + " | Score: " + str(self.game.game_state.score)
-        self.status_label.config(text=status_text)
+        if 'status' in regions:
+            status_text = "Turn: " + str(game_state.turn) + " | Points: " + str(
+                game_state.points) + " | Score: " + str(game_state.score)
+            if status_text != self.status_label.cget('text'):
+                self.status_label.config(text=status_text)
 
         # Update HP bar
-        hp_percent = (self.game.game_state.server_hp / self.game.game_state.max_server_hp) * 100
-        self.hp_bar['value'] = hp_percent
-        hp_text = str(self.game.game_state.server_hp) + "/" + str(self.game.game_state.max_server_hp)
-        self.hp_label.config(text=hp_text)
-
-        # Update threats list
-        self.threats_listbox.delete(0, tk.END)
-        for i, threat in enumerate(self.game.game_state.active_threats):
-            hp_bar = "█" * (threat.hp * 10 // threat.max_hp) + "░" * (10 - threat.hp * 10 // threat.max_hp)
-            threat_text = threat.type + " HP:" + str(threat.hp) + "/" + str(
-                threat.max_hp) + " [" + hp_bar + "] ATK:" + str(threat.attack)
-            if threat.detection_chance < 1.0:
-                threat_text += " [HIDDEN]"
-            self.threats_listbox.insert(tk.END, threat_text)
+        if 'hp' in regions:
+            hp_text = str(game_state.server_hp) + "/" + str(game_state.max_server_hp)
+            if hp_text != self.hp_label.cget('text'):
+                self.hp_bar['value'] = (game_state.server_hp / game_state.max_server_hp) * 100
+                self.hp_label.config(text=hp_text)
+
+        # Threat and tool rows are keyed by object / tool type, so only changed rows are redrawn.
+        # Selections stay on the same threat / tool, wherever their rows moved to.
+        if 'threats' in regions:
+            selected_threat = self.threats_view.key_at(self.selected_threat)
+            self.threats_view.update(game_state.active_threats)
+            self.selected_threat = self.threats_view.index_of(selected_threat)
+            self.threats_view.select(self.selected_threat)
 
         # Update tools list
-        self.tools_listbox.delete(0, tk.END)
-        for tool_type in self.game.game_state.owned_tools:
-            self.tools_listbox.insert(tk.END, tool_type)
+        if 'tools' in regions:
+            selected_tool = self.tools_view.key_at(self.selected_tool)
+            self.tools_view.update(game_state.owned_tools,
+                                   [TOOL_NAMES[tool_type] for tool_type in game_state.owned_tools])
+            self.selected_tool = self.tools_view.index_of(selected_tool)
+            self.tools_view.select(self.selected_tool)
 
         # Update shop
-        self.shop_listbox.delete(0, tk.END)
-        for tool_type, tool in self.game.tools_data.items():
-            if tool_type not in self.game.game_state.owned_tools:
-                cost = int(tool.cost * self.game.game_state.shop_price_multiplier)
-                affordable = "✓" if self.game.game_state.points >= cost else "✗"
-                shop_text = affordable + " " + tool_type + " Cost: " + str(cost)
-                self.shop_listbox.insert(tk.END, shop_text)
-
-        # Check game over
-        if self.game.game_state.game_over:
+        if 'shop' in regions:
+            shop_selection = self.shop_listbox.curselection()
+            selected_shop = self.shop_view.key_at(shop_selection[0] if shop_selection else None)
+            shop_keys = []
+            shop_rows = []
+            for tool_type, tool in self.game.tools_data.items():
+                if tool_type not in game_state.owned_tools:
+                    cost = int(tool.cost * game_state.shop_price_multiplier)
+                    affordable = "✓" if game_state.points >= cost else "✗"
+                    shop_keys.append(tool_type)
+                    shop_rows.append(affordable + " " + TOOL_NAMES[tool_type] + " Cost: " + str(cost))
+            self.shop_view.update(shop_keys, shop_rows)
+            self.shop_view.select(self.shop_view.index_of(selected_shop))
+
+        # Check game over; a turbo run reports its own end through its 'done' event
+        if self.game.game_state.game_over and self.turbo_thread is None:
             self.game_over()
 
-    def on_threat_select(self, event):
-        selection = self.threats_listbox.curselection()
-        if selection:
-            self.selected_threat = selection[0]
+    def log(self, message):
+        self.log_lines([message])
+
+    def log_lines(self, lines):
+        self.log_text.config(state=tk.NORMAL)
+        self.log_text.insert(tk.END, "\n".join(lines) + "\n")
+
+        # Keep the panel bounded however long a turbo run goes
+        line_count = int(self.log_text.index('end-1c').split('.')[0])
+        if line_count > LOG_MAX_LINES:
+            self.log_text.delete('1.0', str(line_count - LOG_MAX_LINES) + '.0')
+
+        self.log_text.see(tk.END)
+        self.log_text.config(state=tk.DISABLED)
+
+    def turbo_running(self):
+        if self.turbo_thread is not None:
+            self.log("Turbo is running - press Stop first.")
+            return True
+        return False
+
+    def start_turbo(self):
+        if self.turbo_running() or self.game.game_state.game_over:
+            return
+
+        try:
+            turns = int(self.turbo_turns.get())
+        except ValueError:
+            self.dialog(messagebox.showwarning, "Turbo", "Enter a whole number of turns.")
+            return
+
+        policy_name = self.turbo_policy.get()
+
+        # The worker plays on its own fork, so the Tk thread never reads state that is being written
+        self.turbo_stop = threading.Event()
+        self.turbo_latest = None
+        self.turbo_thread = threading.Thread(
+            target=self.turbo_worker,
+            args=(self.game.fork(), POLICIES[policy_name], turns, self.turbo_stop),
+            daemon=True
+        )
+        self.log("Turbo: " + str(turns) + " turns with the " + policy_name + " policy")
+        self.turbo_thread.start()
+        self.root.after(TURBO_DRAIN_MS, self.drain_turbo_events)
+
+    def stop_turbo(self):
+        if self.turbo_stop is not None:
+            self.turbo_stop.set()
+
+    def turbo_worker(self, engine, policy, turns, stop):
+        """Runs on the worker thread; only talks to the GUI through turbo_events and turbo_latest"""
+        events = self.turbo_events
+
+        def log(message):
+            events.put(('log', message))
+
+        for _ in range(turns):
+            if stop.is_set() or engine.game_state.game_over:
+                break
+            play_turn(engine, policy, log=log)
+            # Only the drain empties the slot, so while it's full the GUI hasn't shown the last
+            # state yet and forking this one would be wasted
+            if self.turbo_latest is None:
+                state = engine.game_state.fork()
+                with self.turbo_latest_lock:
+                    self.turbo_latest = state
+
+        events.put(('done', engine))
+
+    def drain_turbo_events(self):
+        lines = []
+        finished = None
+
+        for _ in range(TURBO_DRAIN_BATCH):
+            try:
+                kind, payload = self.turbo_events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'log':
+                lines.append(payload)
+            else:
+                finished = payload
+
+        if lines:
+            self.log_lines(lines)
+
+        with self.turbo_latest_lock:
+            latest_state, self.turbo_latest = self.turbo_latest, None
+
+        if finished is not None:
+            # Carry on from exactly where the worker stopped, RNG included
+            self.game.game_state = finished.game_state
+            self.game.rng = finished.rng
+            self.turbo_thread = None
+            self.turbo_stop = None
+            self.log("Turbo finished on turn " + str(self.game.game_state.turn))
+            # A finished game is handled, and its journal cleared, by game_over() on the redraw
+            if not self.game.game_state.game_over:
+                self.journal.record(self.game.game_state)
+            self.request_redraw()
+            return
+
+        # Only the Tk thread touches the journal, so it journals each state the worker publishes
+        if latest_state is not None:
+            self.game.game_state = latest_state
+            if not latest_state.game_over:
+                self.journal.record(latest_state)
+            self.request_redraw()
+
+        self.root.after(TURBO_DRAIN_MS, self.drain_turbo_events)
+
+    def on_threat_select(self, index):
+        self.selected_threat = index
 
     def on_tool_select(self, event):
         selection = self.tools_listbox.curselection()
@@ -939,62 +730,66 @@ class GameGUI:
             self.selected_tool = selection[0]
 
     def scan_threats(self):
-        if self.game.game_state.scans_this_turn >= 2:
-            messagebox.showwarning("Limit Reached", "You can only scan twice per turn.")
+        if self.turbo_running():
             return
 
-        new_threats = self.game.generate_threats()
-
-        # Apply detection chances
-        detected_threats = []
-        for threat in new_threats:
-            if random.random() < threat.detection_chance:
-                detected_threats.append(threat)
+        with self.measure('engine.scan'):
+            result = self.game.scan()
 
-        self.game.game_state.active_threats.extend(detected_threats)
+        if "error" in result:
+            self.dialog(messagebox.showwarning, "Limit Reached", result["error"])
+            return
 
-        messagebox.showinfo(
+        self.dialog(
+            messagebox.showinfo,
             "Scan Results",
-            "Scan complete!\nFound " + str(len(detected_threats)) + " threats."
+            "Scan complete!\nFound " + str(len(result["detected"])) + " threats."
         )
-        self.update_display()
-        self.game.game_state.scans_this_turn += 1
+        self.request_redraw('threats')
 
     def use_tool(self):
+        if self.turbo_running():
+            return
+
         if self.selected_tool is None or self.selected_threat is None:
-            messagebox.showwarning("Selection Error", "Please select both a tool and a threat!")
+            self.dialog(messagebox.showwarning, "Selection Error", "Please select both a tool and a threat!")
             return
 
         if self.selected_threat >= len(self.game.game_state.active_threats):
-            messagebox.showwarning("Invalid Target", "Selected threat no longer exists!")
+            self.dialog(messagebox.showwarning, "Invalid Target", "Selected threat no longer exists!")
             return
 
         tool_type = self.game.game_state.owned_tools[self.selected_tool]
         target_threat = self.game.game_state.active_threats[self.selected_threat]
 
-        result = self.game.use_tool(tool_type, target_threat)
+        with self.measure('engine.use_tool'):
+            result = self.game.use_tool(tool_type, target_threat)
 
         if "error" in result:
-            messagebox.showerror("Error", result["error"])
+            self.dialog(messagebox.showerror, "Error", result["error"])
             return
 
-        message = "Used " + tool_type + "\n"
+        message = "Used " + TOOL_NAMES[tool_type] + "\n"
         message += "Damage: " + str(result['damage']) + "\n"
         message += "Effectiveness: " + str(round(result['effectiveness'], 1)) + "x\n"
 
         if result["threat_defeated"]:
             message += "Threat defeated!"
 
-        messagebox.showinfo("Attack Result", message)
+        self.dialog(messagebox.showinfo, "Attack Result", message)
 
         # Process defeated threats
-        points_earned = self.game.process_defeated_threats()
+        with self.measure('engine.process_defeated_threats'):
+            points_earned = self.game.process_defeated_threats()
         if points_earned > 0:
-            messagebox.showinfo("Points Earned", "Earned " + str(points_earned) + " points!")
+            self.dialog(messagebox.showinfo, "Points Earned", "Earned " + str(points_earned) + " points!")
 
-        self.update_display()
+        self.request_redraw('status', 'threats', 'shop')
 
     def buy_tool(self, event):
+        if self.turbo_running():
+            return
+
         selection = self.shop_listbox.curselection()
         if not selection:
             return
@@ -1010,62 +805,127 @@ class GameGUI:
 
         tool_type = available_tools[selection[0]]
 
-        if self.game.buy_tool(tool_type):
-            messagebox.showinfo("Purchase Successful", "Bought " + tool_type + "!")
-            self.update_display()
+        with self.measure('engine.buy_tool'):
+            bought = self.game.buy_tool(tool_type)
+
+        if bought:
+            self.dialog(messagebox.showinfo, "Purchase Successful", "Bought " + TOOL_NAMES[tool_type] + "!")
+            self.request_redraw('status', 'tools', 'shop')
         else:
-            messagebox.showwarning("Purchase Failed", "Not enough points or tool already owned!")
+            self.dialog(messagebox.showwarning, "Purchase Failed", "Not enough points or tool already owned!")
 
     def next_turn(self):
+        if self.turbo_running():
+            return
+
         # Process threat attacks
-        self.game.process_threat_attacks()
+        with self.measure('engine.process_threat_attacks'):
+            self.game.process_threat_attacks()
 
         if not self.game.game_state.game_over:
-            self.game.next_turn()
-            messagebox.showinfo("Turn Complete", "Turn " + str(self.game.game_state.turn) + " begins!")
-            self.update_display()
+            with self.measure('engine.next_turn'):
+                self.game.next_turn()
+            with self.measure('journal.record'):
+                self.journal.record(self.game.game_state)
+            self.dialog(messagebox.showinfo, "Turn Complete", "Turn " + str(self.game.game_state.turn) + " begins!")
 
+        # Repaint even when the server fell, so the game over check runs
+        self.request_redraw()
 
     def save_game(self):
-        save_name = simpledialog.askstring("Save Game", "Enter save name:")
+        save_name = self.dialog(simpledialog.askstring, "Save Game", "Enter save name:")
         if save_name:
-            if self.game.db.save_game(save_name, self.game.game_state):
-                messagebox.showinfo("Save Successful", "Game saved as '" + save_name + "'!")
-            else:
-                messagebox.showerror("Save Failed", "Failed to save game!")
+            def saved(ok, error):
+                if ok:
+                    self.dialog(messagebox.showinfo, "Save Successful", "Game saved as '" + save_name + "'!")
+                else:
+                    self.dialog(messagebox.showerror, "Save Failed", "Failed to save game!\n" + str(error))
+
+            self.game.db.save_game_async(save_name, self.game.game_state, self.db_callback(saved))
+
+    def db_callback(self, on_done):
+        """Wrap on_done(ok, error) so a background write's result is handled on the Tk thread"""
+        self.db_pending += 1
+        if self.db_pending == 1:
+            self.root.after(DB_POLL_MS, self.poll_db_events)
+        return lambda ok, error: self.db_events.put((on_done, ok, error))
+
+    def poll_db_events(self):
+        while True:
+            try:
+                on_done, ok, error = self.db_events.get_nowait()
+            except queue.Empty:
+                break
+            self.db_pending -= 1
+            on_done(ok, error)
+
+        if self.db_pending > 0:
+            self.root.after(DB_POLL_MS, self.poll_db_events)
+
+    def high_score_saved(self, ok, error):
+        if ok:
+            self.log("High score saved")
+        else:
+            self.log("High score not saved: " + str(error))
 
     def load_game(self):
-        save_names = self.game.db.get_save_names()
-        if not save_names:
-            messagebox.showinfo("No Saves", "No saved games found!")
+        if self.turbo_running():
+            return
+
+        if not self.game.db.list_saves(limit=1):
+            self.dialog(messagebox.showinfo, "No Saves", "No saved games found!")
             return
 
         # Create selection dialogue
         dialogue = tk.Toplevel(self.root)
         dialogue.title("Load Game")
-        dialogue.geometry("300x400")
+        dialogue.geometry("700x400")
         dialogue.configure(bg='#2d2d2d')
 
-        tk.Label(dialogue, text="Select save to load:", bg='#2d2d2d', fg='white').pack(pady=10)
-
-        listbox = tk.Listbox(dialogue, bg='#1a1a1a', fg='white')
-        listbox.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        tk.Label(dialogue, text="Select save to load (click a heading to sort):", bg='#2d2d2d', fg='white').pack(pady=10)
+
+        # Only the summary columns are read here; the full state is loaded once a save is picked
+        columns = ('save_name', 'turn', 'score', 'server_hp', 'points', 'threat_count', 'tool_count', 'updated_at')
+        headings = ('Save', 'Turn', 'Score', 'HP', 'Points', 'Threats', 'Tools', 'Saved')
+        tree = ttk.Treeview(dialogue, columns=columns, show='headings', selectmode='browse')
+        sort = {'column': 'updated_at', 'descending': True}
+        hide_finished = tk.BooleanVar(value=False)
+
+        def refresh():
+            saves = self.game.db.list_saves(sort['column'], sort['descending'],
+                                            game_over=False if hide_finished.get() else None,
+                                            limit=SAVE_LIST_LIMIT)
+            tree.delete(*tree.get_children())
+            for save in saves:
+                tree.insert('', 'end', iid=save['save_name'], values=[save[column] for column in columns])
+
+        def sort_by(column):
+            sort['descending'] = not sort['descending'] if sort['column'] == column else column != 'save_name'
+            sort['column'] = column
+            refresh()
+
+        for column, heading in zip(columns, headings):
+            tree.heading(column, text=heading, command=lambda column=column: sort_by(column))
+            tree.column(column, width=150 if column in ('save_name', 'updated_at') else 60)
+        tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
 
-        for save_name in save_names:
-            listbox.insert(tk.END, save_name)
+        tk.Checkbutton(dialogue, text="Hide finished games", variable=hide_finished, command=refresh,
+                       bg='#2d2d2d', fg='white', selectcolor='#1a1a1a').pack()
+        refresh()
 
         def load_selected():
-            selection = listbox.curselection()
+            selection = tree.selection()
             if selection:
-                save_name = save_names[selection[0]]
+                save_name = selection[0]
                 loaded_state = self.game.db.load_game(save_name)
                 if loaded_state:
                     self.game.game_state = loaded_state
-                    messagebox.showinfo("Load Successful", "Loaded '" + save_name + "'!")
-                    self.update_display()
+                    self.journal.start(loaded_state)
+                    self.dialog(messagebox.showinfo, "Load Successful", "Loaded '" + save_name + "'!")
+                    self.request_redraw()
                     dialogue.destroy()
                 else:
-                    messagebox.showerror("Load Failed", "Failed to load game!")
+                    self.dialog(messagebox.showerror, "Load Failed", "Failed to load game!")
 
         tk.Button(dialogue, text="Load", command=load_selected, bg='#006600', fg='white').pack(pady=10)
         tk.Button(dialogue, text="Cancel", command=dialogue.destroy, bg='#660000', fg='white').pack()
@@ -1075,7 +935,7 @@ class GameGUI:
         quit()
 
     def show_high_scores(self):
-        scores = self.game.db.get_high_scores()
+        scores, after = self.game.db.get_high_scores_page()
 
         dialogue = tk.Toplevel(self.root)
         dialogue.title("High Scores")
@@ -1092,32 +952,56 @@ class GameGUI:
             tree.heading(col, text=col)
             tree.column(col, width=80)
 
-        for i, score_data in enumerate(scores, 1):
-            player, score, turns, date = score_data
-            tree.insert('', 'end', values=(i, player, score, turns, date[:10]))
+        def add_rows(rows):
+            rank = len(tree.get_children())
+            for rank, score_data in enumerate(rows, rank + 1):
+                player, score, turns, date = score_data
+                tree.insert('', 'end', values=(rank, player, score, turns, date[:10]))
 
+        add_rows(scores)
         tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
 
-        tk.Button(dialogue, text="Close", command=dialogue.destroy, bg='#660000', fg='white').pack(pady=10)
+        button_frame = tk.Frame(dialogue, bg='#2d2d2d')
+        button_frame.pack(pady=10)
+
+        # Later pages are fetched on demand, seeking from the last row shown
+        def show_more():
+            nonlocal after
+            rows, after = self.game.db.get_high_scores_page(after)
+            add_rows(rows)
+            if after is None:
+                more_button.config(state=tk.DISABLED)
+
+        more_button = tk.Button(button_frame, text="More", command=show_more, bg='#006600', fg='white',
+                                state=tk.NORMAL if after is not None else tk.DISABLED)
+        more_button.pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Close", command=dialogue.destroy, bg='#660000', fg='white').pack(side=tk.LEFT, padx=5)
 
     def game_over(self):
-        player_name = self.username or simpledialog.askstring("Game Over", "Enter your name for high score:")
+        # Nothing left to recover
+        self.journal.clear()
+
+        player_name = self.username or self.dialog(simpledialog.askstring, "Game Over",
+                                                   "Enter your name for high score:")
         if player_name:
-            self.game.db.save_high_score(player_name, self.game.game_state.score, self.game.game_state.turn)
+            self.game.db.save_high_score_async(player_name, self.game.game_state.score, self.game.game_state.turn,
+                                               self.db_callback(self.high_score_saved))
 
         message = "Game Over!\n\nFinal Score: " + str(self.game.game_state.score) + "\n"
-        message += "Turns Survived: " + str(self.game.game_state.turn) + "\n\n"
+        message += "Turns Survived: " + str(self.game.game_state.turn) + "\n"
+        message += "Leaderboard Rank: " + str(self.game.db.get_rank(self.game.game_state.score)) + "\n\n"
         message += "Would you like to start a new game?"
 
-        if messagebox.askyesno("Game Over", message):
-            self.game.game_state = GameState()
-            self.game.game_state.owned_tools = [ToolType.BASIC_FIREWALL, ToolType.ANTIVIRUS_SCANNER]
-            self.update_display()
+        if self.dialog(messagebox.askyesno, "Game Over", message):
+            self.game.new_game()
+            self.journal.start(self.game.game_state)
+            self.request_redraw()
 
     def run(self):
         self.root.mainloop()
 
 
 if __name__ == "__main__":
-    game = GameGUI()
+    # python testing2.py [username]; without one, play as the logged-in user
+    game = GameGUI(sys.argv[1] if len(sys.argv) > 1 else getpass.getuser())
     game.run()
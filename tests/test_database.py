@@ -0,0 +1,44 @@
+import os
+import tempfile
+import unittest
+
+from database import DatabaseManager, SQLITE_INT_MAX
+from engine import GameEngine
+
+
+class SaveMetadataTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.db = DatabaseManager(os.path.join(self.directory.name, 'test.db'))
+
+    def tearDown(self):
+        self.db.close()
+        self.directory.cleanup()
+
+    def test_huge_ints_round_trip(self):
+        game_state = GameEngine(1).game_state
+        game_state.score = 10 ** 30
+        game_state.points = -10 ** 25
+        game_state.turn = 2 ** 70
+
+        self.db.save_game('huge', game_state)
+        loaded = self.db.load_game('huge')
+        self.assertEqual((loaded.score, loaded.points, loaded.turn), (10 ** 30, -10 ** 25, 2 ** 70))
+
+        # The summary columns saturate instead of refusing the save
+        summary = self.db.list_saves(limit=1)[0]
+        self.assertEqual(summary['score'], SQLITE_INT_MAX)
+        self.assertEqual(summary['turn'], SQLITE_INT_MAX)
+
+    def test_huge_ints_async(self):
+        game_state = GameEngine(2).game_state
+        game_state.server_hp = 10 ** 40
+        results = []
+        self.db.save_game_async('huge', game_state, lambda ok, error: results.append(ok))
+        self.db.flush()
+        self.assertEqual(results, [True])
+        self.assertEqual(self.db.load_game('huge').server_hp, 10 ** 40)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,30 @@
+import unittest
+
+from engine import GameEngine, Threat, ThreatType, ToolType, add_threat_type
+
+
+class CustomThreatTypeTest(unittest.TestCase):
+    def test_tool_targeting_custom_type(self):
+        engine = GameEngine(1)
+        game_state = engine.game_state
+        game_state.owned_tools = [ToolType.BASIC_FIREWALL, ToolType.ANTIVIRUS_SCANNER, ToolType.IDS]
+        # Build the damage and best-tool tables before the type exists
+        engine.tool_damage(ToolType.IDS, ThreatType.VIRUS)
+        engine.best_tool_for(ThreatType.VIRUS)
+
+        code = add_threat_type('test_cryptojacker')
+        engine.tools_data[ToolType.IDS].effectiveness[code] = 2.0
+
+        self.assertEqual(engine.best_tool_for(code), ToolType.IDS)
+        effectiveness = 2.0 * game_state.tool_effectiveness_multiplier
+        self.assertEqual(engine.tool_damage(ToolType.IDS, code)[0], effectiveness)
+        result = engine.use_tool(ToolType.IDS, Threat(code, 1000, 1000, 5))
+        self.assertEqual(result['effectiveness'], effectiveness)
+
+        # Tools that don't name it still do the default
+        self.assertEqual(engine.tool_damage(ToolType.BASIC_FIREWALL, code)[0],
+                         0.1 * game_state.tool_effectiveness_multiplier)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+
+from database import DatabaseManager
+from engine import GameEngine
+from journal import SCALAR_FIELDS, TurnJournal, threat_row
+from simulate import POLICIES, play_turn
+
+
+def state_key(game_state):
+    return ([getattr(game_state, name) for name in SCALAR_FIELDS], list(game_state.owned_tools),
+            [threat_row(threat) for threat in game_state.active_threats])
+
+
+class TurnJournalTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.db = DatabaseManager(os.path.join(self.directory.name, 'test.db'))
+
+    def tearDown(self):
+        self.db.close()
+        self.directory.cleanup()
+
+    def play(self, journal, turns):
+        """Keys of the state after start and after each turn, in journal seq order from 1"""
+        engine = GameEngine(3)
+        engine.game_state.server_hp = engine.game_state.max_server_hp = 10 ** 6
+        journal.start(engine.game_state)
+        states = [state_key(engine.game_state)]
+        for _ in range(turns):
+            play_turn(engine, POLICIES['greedy'], 2, 3)
+            journal.record(engine.game_state)
+            states.append(state_key(engine.game_state))
+        self.db.flush()
+        return states
+
+    def test_round_trip(self):
+        journal = TurnJournal(self.db, 'player', snapshot_every=5)
+        states = self.play(journal, 8)
+        kinds = [row[1] for row in self.db.read_journal('player')]
+        self.assertEqual(kinds[0], 'snapshot')
+        self.assertIn('delta', kinds)
+        self.assertEqual(state_key(journal.recover()), states[-1])
+
+    def test_missing_entry(self):
+        # Entries queued behind a lost one still commit; recovery has to stop at the gap
+        submit = self.db.append_journal_async
+        self.db.append_journal_async = lambda session, turn, kind, seq, data, callback=None: (
+            None if seq == 4 else submit(session, turn, kind, seq, data, callback))
+        journal = TurnJournal(self.db, 'player', snapshot_every=50)
+        states = self.play(journal, 8)
+        self.assertEqual(state_key(journal.recover()), states[2])
+
+    def test_torn_entry(self):
+        journal = TurnJournal(self.db, 'player', snapshot_every=50)
+        states = self.play(journal, 8)
+        self.db.conn.execute("UPDATE autosave_journal SET data = substr(data, 1, 5) WHERE session = 'player' AND seq = 6")
+        self.db.conn.commit()
+        self.assertEqual(state_key(TurnJournal(self.db, 'player').recover()), states[4])
+
+    def test_empty(self):
+        self.assertIsNone(TurnJournal(self.db, 'nobody').recover())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import json
+import unittest
+from unittest import mock
+
+from engine import GameEngine, ToolType
+from replay import ActionRecorder, Replay, state_checksum
+from simulate import POLICIES, play_turn
+
+
+class KeywordActionTest(unittest.TestCase):
+    def test_keyword_arguments_replay(self):
+        engine = GameEngine(11)
+        recorder = ActionRecorder(engine)
+
+        engine.buy_tool(tool_type=ToolType.IDS)
+        for _ in range(3):
+            engine.scan()
+            for threat in list(engine.game_state.active_threats):
+                engine.use_tool(tool_type=ToolType.IDS, target_threat=threat)
+            engine.process_defeated_threats()
+            engine.process_threat_attacks()
+            engine.next_turn()
+        recorder.detach(engine)
+
+        log = json.loads(json.dumps(recorder.to_dict()))
+        replayed = Replay(log).run()
+        self.assertIn(ToolType.IDS, replayed.game_state.owned_tools)
+        self.assertEqual(state_checksum(replayed.game_state), state_checksum(engine.game_state))
+
+
+class SeekTest(unittest.TestCase):
+    def test_seek_matches_recording(self):
+        engine = GameEngine(1)
+        recorder = ActionRecorder(engine)
+        checksums = {engine.game_state.turn: state_checksum(engine.game_state)}
+        while True:
+            play_turn(engine, POLICIES['greedy'])
+            if engine.game_state.game_over:
+                break
+            # The state each turn starts from, which is where seek() lands
+            checksums[engine.game_state.turn] = state_checksum(engine.game_state)
+        recorder.detach(engine)
+
+        # Games are short, so snapshot often enough for seek() to start from one
+        with mock.patch('replay.SNAPSHOT_TURNS', 2):
+            replay = Replay(json.loads(json.dumps(recorder.to_dict())))
+            self.assertEqual(state_checksum(replay.run().game_state), state_checksum(engine.game_state))
+            self.assertGreater(len(replay.snapshots), 1)
+            turns = sorted(checksums)
+            for turn in turns[::-1] + turns:
+                self.assertEqual(state_checksum(replay.seek(turn).game_state), checksums[turn])
+
+    def test_tampered_log_diverges(self):
+        engine = GameEngine(9)
+        recorder = ActionRecorder(engine)
+        for _ in range(5):
+            play_turn(engine, POLICIES['greedy'])
+        log = json.loads(json.dumps(recorder.to_dict()))
+        log['checksums'][-1][2] ^= 1
+        with self.assertRaises(ValueError):
+            Replay(log).run()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import hashlib
+import unittest
+import zlib
+
+from engine import GameEngine, TOOL_NAMES, THREAT_NAMES
+from journal import SCALAR_FIELDS, threat_row
+from save_format import (HEADER, MANIFEST_MAGIC, STATE_ROW, THREAT_CHUNK_ROWS, THREAT_ROW, TYPE_COUNT,
+                         decode_game_state, decode_manifest, encode_game_state, encode_manifest, is_binary,
+                         manifest_hashes, pack_names, pack_spawn_chunk, split_threats)
+
+
+def state_key(game_state):
+    return ([getattr(game_state, name) for name in SCALAR_FIELDS], list(game_state.owned_tools),
+            [threat_row(threat) for threat in game_state.active_threats])
+
+
+def sample_state(threat_count=1500):
+    engine = GameEngine(5)
+    game_state = engine.game_state
+    game_state.active_threats = engine.generate_threats(threat_count)
+    game_state.active_threats[0].special_active = True
+    game_state.turn = 40
+    game_state.score = 12345
+    return game_state
+
+
+def build_manifest(version, raw_chunks):
+    chunks = {}
+    hashes = []
+    for raw in raw_chunks:
+        digest = hashlib.sha256(raw).digest()
+        hashes.append(digest)
+        chunks[digest] = zlib.compress(raw)
+    return MANIFEST_MAGIC + bytes([version]) + b''.join(hashes), chunks
+
+
+def scalar_chunks(game_state):
+    return [
+        HEADER.pack(
+            game_state.server_hp, game_state.max_server_hp, game_state.points, game_state.score,
+            game_state.turn, game_state.botnet_buff, game_state.game_over,
+            game_state.points_multiplier, game_state.tool_effectiveness_multiplier, game_state.shop_price_multiplier,
+            len(game_state.active_threats), len(game_state.owned_tools), 0
+        ),
+        b''.join(pack_names(TOOL_NAMES[tool_type] for tool_type in game_state.owned_tools)),
+    ]
+
+
+class SaveFormatTest(unittest.TestCase):
+    def test_binary_round_trip(self):
+        game_state = sample_state()
+        data = encode_game_state(game_state)
+        self.assertTrue(is_binary(data))
+        self.assertEqual(state_key(decode_game_state(data)), state_key(game_state))
+
+    def test_json_fallback(self):
+        game_state = sample_state(10)
+        game_state.points = 10 ** 30
+        data = encode_game_state(game_state)
+        self.assertIsInstance(data, str)
+        self.assertEqual(state_key(decode_game_state(data)), state_key(game_state))
+
+    def test_manifest_round_trip(self):
+        game_state = sample_state()
+        manifest, chunks = encode_manifest(game_state)
+        self.assertEqual(set(manifest_hashes(manifest)), set(chunks))
+        self.assertEqual(state_key(decode_manifest(manifest, chunks)), state_key(game_state))
+
+    def test_manifest_shares_spawn_chunks(self):
+        engine = GameEngine(6)
+        engine.game_state.active_threats = engine.generate_threats(2000)
+        first, _ = encode_manifest(engine.game_state)
+        for threat in engine.game_state.active_threats[:5]:
+            threat.hp = 0
+        engine.process_defeated_threats()
+        engine.next_turn()
+        second, _ = encode_manifest(engine.game_state)
+        # Scalars and state change every turn, spawn runs only around the removed threats
+        shared = set(manifest_hashes(first)) & set(manifest_hashes(second))
+        self.assertGreater(len(shared), len(manifest_hashes(second)) // 2)
+
+    def test_version_1_manifest(self):
+        game_state = sample_state()
+        threats = game_state.active_threats
+        raw_chunks = scalar_chunks(game_state)
+        for start in range(0, len(threats), THREAT_CHUNK_ROWS):
+            block = threats[start:start + THREAT_CHUNK_ROWS]
+            types = list(dict.fromkeys(threat.type for threat in block))
+            raw_chunks.append(TYPE_COUNT.pack(len(types)) +
+                              b''.join(pack_names(THREAT_NAMES[threat_type] for threat_type in types)) +
+                              b''.join(THREAT_ROW.pack(types.index(threat.type), threat.hp, threat.max_hp,
+                                                       threat.attack, threat.special_active, threat.turns_alive,
+                                                       threat.detection_chance) for threat in block))
+        manifest, chunks = build_manifest(1, raw_chunks)
+        self.assertEqual(state_key(decode_manifest(manifest, chunks)), state_key(game_state))
+
+    def test_version_2_manifest(self):
+        game_state = sample_state()
+        raw_chunks = scalar_chunks(game_state)
+        for run in split_threats(game_state.active_threats, game_state.turn):
+            raw_chunks.append(pack_spawn_chunk(run, game_state.turn))
+            raw_chunks.append(b''.join(STATE_ROW.pack(threat.hp, threat.attack, threat.special_active)
+                                       for threat in run))
+        manifest, chunks = build_manifest(2, raw_chunks)
+        self.assertEqual(state_key(decode_manifest(manifest, chunks)), state_key(game_state))
+
+    def test_unknown_manifest_version(self):
+        manifest, chunks = encode_manifest(sample_state(10))
+        with self.assertRaises(ValueError):
+            decode_manifest(MANIFEST_MAGIC + bytes([99]) + manifest[len(MANIFEST_MAGIC) + 1:], chunks)
+
+
+if __name__ == '__main__':
+    unittest.main()